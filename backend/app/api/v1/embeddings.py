@@ -1,26 +1,33 @@
+import asyncio
+import datetime as dt
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
 from supabase import Client
 
-from app.services.embeddings import embed_text
+from app.core.config import get_settings
+from app.schemas.embeddings import VideoBatchEmbeddingRequest, VideoBatchEmbeddingResponse
+from app.services.bulk_writer import BulkUpserter
+from app.services.cache import get_cache
+from app.services.embeddings import embed_text, get_embedding_stats
+from app.services.enrichment import attach_embeddings, embedding_row, load_videos
+from app.services.enrichment import video_embedding_text as _make_text_from_video
+from app.services.recommendation_cache import (
+    bump_user_version,
+    cache_recommendations,
+    get_cached_recommendations,
+    recommendation_key,
+)
+from app.services.repository import SupabaseRepository, get_repository
 from app.services.supabase_client import get_supabase_client
-from app.api.v1.feedback_utils import adjust_preferences_with_feedback
+from app.services.vector_index import get_vector_index
+from app.services.vector_search import asearch_video_embeddings_filtered, publish_video_embeddings
+from app.api.v1.response_utils import ORJSONResponse, ResponseShape, drop_keys
 
 router = APIRouter(prefix="/embeddings", tags=["embeddings"])
 
 
-def _make_text_from_video(video: Dict[str, Any]) -> str:
-    parts = [
-        video.get("title"),
-        video.get("description"),
-    ]
-    tags = video.get("topic_tags") or []
-    if tags:
-        parts.append(" ".join(tags))
-    return " ".join(filter(None, parts)).strip()
-
-
 def _make_text_from_user(profile: Dict[str, Any], preferences: Dict[str, Any]) -> str:
     segments: List[str] = []
     goals = profile.get("goals") or []
@@ -41,17 +48,51 @@ def _make_text_from_user(profile: Dict[str, Any], preferences: Dict[str, Any]) -
     return " ".join(filter(None, segments)).strip()
 
 
-@router.post("/videos/{video_id}")
-def embed_video(video_id: str, client: Client = Depends(get_supabase_client)):
+@router.get("/stats")
+def embedding_stats():
+    index = get_vector_index()
+    return {
+        **get_embedding_stats(),
+        "vector_index": index.stats() if index else {"backend": "rpc"},
+        "recommendation_cache": get_cache("recommendations").stats(),
+    }
+
+
+@router.post("/videos/batch", response_model=VideoBatchEmbeddingResponse)
+def embed_videos_batch(payload: VideoBatchEmbeddingRequest, client: Client = Depends(get_supabase_client)):
+    """
+    Embed many enriched videos: chunked reads, one batched encode, chunked upserts.
+    """
+    video_ids = list(dict.fromkeys(vid.strip() for vid in payload.video_ids if vid.strip()))
+    rows = load_videos(client, video_ids, "video_id, title, description, topic_tags, difficulty, sentiment_score")
+    found = {row["video_id"] for row in rows}
+
+    embedded = attach_embeddings(rows)
+    rows = [embedding_row(video) for video in embedded if video["embedding"]]
+    with BulkUpserter(client, "video_embeddings", on_conflict="video_id") as writer:
+        writer.extend(rows)
+    failed = set(writer.report.failed_keys)
+    publish_video_embeddings([row for row in rows if row["video_id"] not in failed])
+    empty = [video["video_id"] for video in embedded if not video["embedding"]]
+
+    return VideoBatchEmbeddingResponse(
+        embedded=len(embedded) - len(empty) - len(failed),
+        missing=[vid for vid in video_ids if vid not in found],
+        empty=empty,
+        failed=sorted(failed),
+    )
+
+
+@router.post("/videos/{video_id}", response_class=ORJSONResponse)
+async def embed_video(
+    video_id: str,
+    repo: SupabaseRepository = Depends(get_repository),
+    shape: ResponseShape = Depends(),
+):
     video_id = video_id.strip()
-    video_resp = (
-        client.table("videos_raw")
-        .select("title, description, topic_tags, difficulty, sentiment_score")
-        .eq("video_id", video_id)
-        .maybe_single()
-        .execute()
+    video = await repo.row(
+        "videos_raw", "video_id", video_id, "title, description, topic_tags, difficulty, sentiment_score"
     )
-    video = video_resp.data
     if not video:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -65,36 +106,39 @@ def embed_video(video_id: str, client: Client = Depends(get_supabase_client)):
             detail="Video metadata missing text to embed.",
         )
 
-    embedding = embed_text(text)
-    client.table("video_embeddings").upsert(
+    embedding = await run_in_threadpool(embed_text, text)
+    row = {
+        "video_id": video_id,
+        "embedding": embedding,
+        "topics": video.get("topic_tags") or [],
+        "difficulty": video.get("difficulty"),
+        "sentiment_score": video.get("sentiment_score"),
+    }
+    await repo.upsert("video_embeddings", row, on_conflict="video_id")
+    # index upsert and cache version bump may block (Redis), so keep them off the loop
+    await run_in_threadpool(publish_video_embeddings, [row])
+
+    return shape.respond(
         {
             "video_id": video_id,
+            "dimensions": len(embedding),
             "embedding": embedding,
-            "topics": video.get("topic_tags") or [],
             "difficulty": video.get("difficulty"),
             "sentiment_score": video.get("sentiment_score"),
         },
-        on_conflict="video_id",
-    ).execute()
-
-    return {
-        "video_id": video_id,
-        "embedding": embedding,
-        "difficulty": video.get("difficulty"),
-        "sentiment_score": video.get("sentiment_score"),
-    }
+        drop_keys("embedding"),
+    )
 
 
-@router.post("/users/{user_id}")
-def embed_user(
+@router.post("/users/{user_id}", response_class=ORJSONResponse)
+async def embed_user(
     user_id: str,
-    client: Client = Depends(get_supabase_client),
+    repo: SupabaseRepository = Depends(get_repository),
+    shape: ResponseShape = Depends(),
 ):
-    profile_resp = client.table("user_profiles").select("*").eq("user_id", user_id).maybe_single().execute()
-    preferences_resp = client.table("user_preferences").select("*").eq("user_id", user_id).maybe_single().execute()
-
-    profile = profile_resp.data or {}
-    preferences = preferences_resp.data or {}
+    profile, preferences = await asyncio.gather(
+        repo.user_row("user_profiles", user_id), repo.user_row("user_preferences", user_id)
+    )
     text = _make_text_from_user(profile, preferences)
     if not text:
         raise HTTPException(
@@ -102,92 +146,157 @@ def embed_user(
             detail="Insufficient onboarding data to build user embedding.",
         )
 
-    embedding = embed_text(text)
-    client.table("user_embeddings").upsert(
+    embedding = await run_in_threadpool(embed_text, text)
+    await repo.upsert(
+        "user_embeddings",
         {
             "user_id": user_id,
             "embedding": embedding,
             "goals": profile.get("goals") or [],
         },
         on_conflict="user_id",
-    ).execute()
+    )
+    await run_in_threadpool(bump_user_version, user_id)
+
+    return shape.respond(
+        {
+            "user_id": user_id,
+            "dimensions": len(embedding),
+            "embedding": embedding,
+            "goals": profile.get("goals") or [],
+        },
+        drop_keys("embedding"),
+    )
 
-    return {
-        "user_id": user_id,
-        "embedding": embedding,
-        "goals": profile.get("goals") or [],
-    }
 
+def _cached_recommendations(user_id: str, params: Dict[str, Any]) -> tuple[Optional[str], Optional[Dict[str, Any]]]:
+    key = recommendation_key(user_id, params)
+    return key, get_cached_recommendations(key)
 
-@router.post("/recommendations/{user_id}")
-def recommend_videos(
+
+def _compact_recommendations(payload: Dict[str, Any]) -> Dict[str, Any]:
+    compact = {key: value for key, value in payload.items() if key != "explain_candidates"}
+    compact["explain_candidate_ids"] = [record["video_id"] for record in payload["explain_candidates"]]
+    return compact
+
+
+@router.post("/recommendations/{user_id}", response_class=ORJSONResponse)
+async def recommend_videos(
     user_id: str,
-    client: Client = Depends(get_supabase_client),
+    repo: SupabaseRepository = Depends(get_repository),
     limit: int = Query(10, ge=1, le=50),
     min_sentiment: float = Query(0.0, ge=0.0, le=1.0),
     difficulty_filter: Optional[str] = Query(None),
     similarity_threshold: float = Query(0.0, ge=0.0, le=1.0),
     explain_top: int = Query(3, ge=0, le=20),
     include_reasons: bool = Query(True),
+    debug: bool = Query(False, description="Also return rejected candidates with reasons"),
+    shape: ResponseShape = Depends(),
 ):
+    """
+    Compact responses list `explain_candidate_ids` instead of repeating the top
+    accepted records as `explain_candidates` (verbose=true).
+    """
     user_id = user_id.strip()
-    user_resp = (
-        client.table("user_embeddings")
-        .select("embedding")
-        .eq("user_id", user_id)
-        .maybe_single()
-        .execute()
+    # cache lookups may hit Redis, so they run in the threadpool
+    cache_key, cached = await run_in_threadpool(
+        _cached_recommendations,
+        user_id,
+        {
+            "limit": limit,
+            "min_sentiment": min_sentiment,
+            "difficulty_filter": difficulty_filter,
+            "similarity_threshold": similarity_threshold,
+            "explain_top": explain_top,
+            "include_reasons": include_reasons,
+            "debug": debug,
+        },
+    )
+    if cached is not None:
+        return shape.respond({**cached, "cached": True}, _compact_recommendations)
+
+    # the embedding and the feedback counters (to adjust filters) are independent reads
+    user_row, (difficulty_filter, min_sentiment) = await asyncio.gather(
+        repo.row("user_embeddings", "user_id", user_id, "embedding"),
+        repo.adjust_preferences_with_feedback(user_id, difficulty_filter, min_sentiment),
     )
-    if not user_resp or not getattr(user_resp, "data", None):
+    if not user_row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User embedding not found. Run the embedding endpoint first.",
         )
 
-    query_embedding = user_resp.data.get("embedding")
+    query_embedding = user_row.get("embedding")
     if not query_embedding:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Stored user embedding is empty.",
         )
 
-    # adjust based on prior feedback
-    difficulty_filter, min_sentiment = adjust_preferences_with_feedback(
-        client, user_id, difficulty_filter, min_sentiment
+    search = await asearch_video_embeddings_filtered(
+        repo.client,
+        query_embedding,
+        limit,
+        difficulty=difficulty_filter,
+        min_sentiment=min_sentiment,
+        min_similarity=similarity_threshold,
+        include_rejected=debug,
     )
-
-    search_resp = client.rpc("search_video_embeddings", {"query": query_embedding, "_limit": limit}).execute()
-    videos = (search_resp.data if search_resp and getattr(search_resp, "data", None) else []) or []
-
-    accepted = []
-    rejected = []
-    for record in videos:
-        reasons = []
-        sim = record.get("similarity") or 0.0
-        if sim < similarity_threshold:
-            reasons.append("similarity too low")
-        if difficulty_filter and record.get("difficulty") != difficulty_filter:
-            reasons.append("difficulty mismatch")
-        if record.get("sentiment_score") is not None and record.get("sentiment_score") < min_sentiment:
-            reasons.append("sentiment below threshold")
-
-        if reasons:
-            rejected.append(
-                {
-                    **record,
-                    "accepted": False,
-                    "rejection_reason": "; ".join(reasons) if include_reasons else None,
-                }
-            )
-        else:
-            accepted.append({**record, "accepted": True})
+    accepted = search["accepted"]
+    rejected = [
+        {**record, "rejection_reason": record["rejection_reason"] if include_reasons else None}
+        for record in search["rejected"]
+    ]
 
     # Optionally trim accepted set to top explain_top for downstream LLM explanation to save cost
     explain_candidates = accepted[:explain_top] if explain_top >= 0 else accepted
 
-    return {
+    response = {
         "user_id": user_id,
         "accepted": accepted,
         "rejected": rejected,
         "explain_candidates": explain_candidates,
+        **({"candidates_scanned": search["candidates_scanned"], "search_rounds": search["rounds"]} if debug else {}),
     }
+    await run_in_threadpool(cache_recommendations, cache_key, response)
+    return shape.respond({**response, "cached": False}, _compact_recommendations)
+
+
+@router.get("/recommendations/{user_id}/precomputed", response_class=ORJSONResponse)
+async def precomputed_recommendations(
+    user_id: str,
+    repo: SupabaseRepository = Depends(get_repository),
+    limit: int = Query(10, ge=1, le=50),
+    shape: ResponseShape = Depends(),
+):
+    """
+    Serve the batch job's stored top-k instead of searching live. `computed_at` and
+    `stale` (older than PRECOMPUTE_MAX_AGE_HOURS) tell the caller how fresh it is.
+    """
+    user_id = user_id.strip()
+    row = await repo.row(
+        "precomputed_recommendations",
+        "user_id",
+        user_id,
+        "recommendations, difficulty_filter, min_sentiment, catalog_size, computed_at",
+    )
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No precomputed recommendations for this user. Run the precompute job first.",
+        )
+
+    computed_at = dt.datetime.fromisoformat(row["computed_at"])
+    age_seconds = (dt.datetime.now(dt.timezone.utc) - computed_at).total_seconds()
+    return shape.respond(
+        {
+            "user_id": user_id,
+            "accepted": [{**record, "accepted": True} for record in (row.get("recommendations") or [])[:limit]],
+            "difficulty_filter": row.get("difficulty_filter"),
+            "min_sentiment": row.get("min_sentiment"),
+            "catalog_size": row.get("catalog_size"),
+            "computed_at": row["computed_at"],
+            "age_seconds": age_seconds,
+            "stale": age_seconds > get_settings().precompute_max_age_hours * 3600,
+        }
+    )
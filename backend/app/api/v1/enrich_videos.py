@@ -1,17 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from supabase import Client
 
-from app.schemas.enrichment import VideoEnrichmentResult
-from app.services.comments import fetch_top_comments
-from app.services.nlp import (
-    analyze_comments_sentiment,
-    classify_difficulty,
-    extract_topics,
+from app.schemas.enrichment import (
+    VideoBatchEnrichmentRequest,
+    VideoBatchEnrichmentResponse,
+    VideoEnrichmentResult,
 )
+from app.services.comments import fetch_top_comments
+from app.services.bulk_writer import BulkUpserter
+from app.services.enrichment import enrich_videos, enrichment_row, load_videos
+from app.services.nlp import analyze_comments_sentiment, enrich_text
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="/enrich", tags=["enrichment"])
 
+@router.post("/videos/batch", response_model=VideoBatchEnrichmentResponse)
+def enrich_videos_batch(payload: VideoBatchEnrichmentRequest, client: Client = Depends(get_supabase_client)):
+    video_ids = list(dict.fromkeys(vid.strip() for vid in payload.video_ids if vid.strip()))
+
+    try:
+        rows = load_videos(client, video_ids, "video_id, title, description")
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load videos: {exc}",
+        ) from exc
+
+    found = {row["video_id"] for row in rows}
+    missing = [vid for vid in video_ids if vid not in found]
+    updates = enrich_videos(rows)
+
+    titles = {row["video_id"]: row["title"] for row in rows}
+    with BulkUpserter(client, "videos_raw", on_conflict="video_id") as writer:
+        writer.extend(enrichment_row({**update, "title": titles[update["video_id"]]}) for update in updates)
+    failed = set(writer.report.failed_keys)
+    if updates and len(failed) == len(updates):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to persist enrichment: {writer.report.errors[:1]}",
+        )
+
+    return VideoBatchEnrichmentResponse(
+        enriched=len(updates) - len(failed),
+        results=[VideoEnrichmentResult(**update) for update in updates if update["video_id"] not in failed],
+        missing=missing,
+        failed=sorted(failed),
+    )
+
 
 @router.post("/videos/{video_id}", response_model=VideoEnrichmentResult)
 def enrich_video(video_id: str, client: Client = Depends(get_supabase_client)):
@@ -37,8 +72,9 @@ def enrich_video(video_id: str, client: Client = Depends(get_supabase_client)):
     text = " ".join(
         filter(None, [video.get("title"), video.get("description")])
     ).strip()
-    diff = classify_difficulty(text)
-    topics = extract_topics(text)
+    enrichment = enrich_text(text)
+    diff = enrichment["difficulty"]
+    topics = enrichment["topics"]
 
     sentiment_score = None
     comment_count = 0
@@ -1,40 +1,37 @@
-from typing import Optional, List
+import asyncio
+import json
+from typing import Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from supabase import Client
+from fastapi.responses import StreamingResponse
 
-from app.services.explanations import build_context_payload, generate_explanation
-from app.services.supabase_client import get_supabase_client
+from app.api.v1.response_utils import ORJSONResponse, ResponseShape, drop_keys
+from app.services.explanations import (
+    astream_explanations,
+    build_context_payload,
+    run_explanation,
+    run_explanations,
+)
+from app.services.repository import SupabaseRepository, get_repository
+from app.services.vector_search import asearch_video_embeddings_filtered
 
 router = APIRouter(prefix="/explanations", tags=["explanations"])
 
 
-def _fetch_user_data(client: Client, user_id: str) -> tuple[dict, dict, dict]:
-    def safe_fetch(table: str) -> dict:
-        try:
-            resp = client.table(table).select("*").eq("user_id", user_id).maybe_single().execute()
-            return resp.data or {}
-        except Exception:
-            return {}
+USER_TABLES = ("user_profiles", "user_preferences", "user_embeddings")
 
-    profile = safe_fetch("user_profiles")
-    preferences = safe_fetch("user_preferences")
-    embedding = safe_fetch("user_embeddings")
 
+async def _fetch_user_data(repo: SupabaseRepository, user_id: str) -> tuple[dict, dict, dict]:
+    # the three lookups run concurrently; a failed one degrades to {}
+    rows = await asyncio.gather(*(repo.user_row(table, user_id) for table in USER_TABLES), return_exceptions=True)
+    profile, preferences, embedding = ({} if isinstance(row, Exception) else row for row in rows)
     return profile, preferences, embedding
 
 
-def _fetch_video_data(client: Client, video_id: str) -> dict:
+async def _fetch_video_data(repo: SupabaseRepository, video_id: str) -> dict:
     video_id = video_id.strip()
     try:
-        video_resp = (
-            client.table("videos_raw")
-            .select("*")
-            .eq("video_id", video_id)
-            .maybe_single()
-            .execute()
-        )
-        video = video_resp.data if video_resp else None
+        video = await repo.video(video_id)
     except Exception:
         video = None
 
@@ -46,17 +43,27 @@ def _fetch_video_data(client: Client, video_id: str) -> dict:
     return video
 
 
-@router.post("/video/{video_id}/user/{user_id}")
-def explain_recommendation(
+async def _fetch_videos(repo: SupabaseRepository, video_ids: List[str]) -> Dict[str, dict]:
+    try:
+        rows = await repo.videos([vid.strip() for vid in video_ids])
+    except Exception:
+        rows = []
+    return {row["video_id"]: row for row in rows}
+
+
+@router.post("/video/{video_id}/user/{user_id}", response_class=ORJSONResponse)
+async def explain_recommendation(
     video_id: str,
     user_id: str,
-    client: Client = Depends(get_supabase_client),
+    repo: SupabaseRepository = Depends(get_repository),
     similarity: float | None = Query(None, description="Optional similarity score from pgvector"),
     min_sentiment: float = Query(0.0, ge=0.0, le=1.0),
     difficulty_filter: str | None = Query(None),
+    shape: ResponseShape = Depends(),
 ):
-    profile, preferences, user_embedding = _fetch_user_data(client, user_id)
-    video = _fetch_video_data(client, video_id)
+    (profile, preferences, user_embedding), video = await asyncio.gather(
+        _fetch_user_data(repo, user_id), _fetch_video_data(repo, video_id)
+    )
 
     context = build_context_payload(
         user_id,
@@ -71,84 +78,101 @@ def explain_recommendation(
         },
     )
 
-    explanation = generate_explanation(context)
-    return {
-        "user_id": user_id,
-        "video_id": video_id,
-        "explanation": explanation["explanation"],
-        "usage": explanation["usage"],
-        "context": explanation["context"],
-    }
+    explanation = await run_explanation(context)
+    return shape.respond(
+        {
+            "user_id": user_id,
+            "video_id": video_id,
+            "explanation": explanation["explanation"],
+            "usage": explanation["usage"],
+            "cached": explanation["cached"],
+            "context": explanation["context"],
+        },
+        drop_keys("context"),
+    )
 
 
-@router.post("/batch/{user_id}")
-def explain_batch(
+@router.post("/batch/{user_id}", response_class=ORJSONResponse)
+async def explain_batch(
     user_id: str,
     video_ids: list[str],
-    client: Client = Depends(get_supabase_client),
+    repo: SupabaseRepository = Depends(get_repository),
     min_sentiment: float = Query(0.0, ge=0.0, le=1.0),
     difficulty_filter: str | None = Query(None),
+    batched: bool = Query(False, description="Explain all videos in shared-prompt JSON calls"),
+    shape: ResponseShape = Depends(),
 ):
-    profile, preferences, user_embedding = _fetch_user_data(client, user_id)
+    (profile, preferences, user_embedding), videos = await asyncio.gather(
+        _fetch_user_data(repo, user_id), _fetch_videos(repo, video_ids)
+    )
     if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"User profile not found for {user_id}",
         )
 
-    results = []
     for vid in video_ids:
-        video = _fetch_video_data(client, vid)
-        context = build_context_payload(
+        if vid.strip() not in videos:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Video {vid.strip()} not found",
+            )
+
+    contexts = [
+        build_context_payload(
             user_id,
             profile,
             preferences,
             user_embedding,
-            video,
+            videos[vid.strip()],
             {
                 "similarity": None,
                 "min_sentiment": min_sentiment,
                 "difficulty_filter": difficulty_filter,
             },
         )
-        explanation = generate_explanation(context)
+        for vid in video_ids
+    ]
+    results = []
+    for vid, explanation in zip(video_ids, await run_explanations(contexts, batched=batched)):
         results.append(
             {
                 "user_id": user_id,
                 "video_id": vid,
                 "explanation": explanation["explanation"],
                 "usage": explanation["usage"],
-                "context": explanation["context"],
+                "cached": explanation["cached"],
+                "batched": explanation.get("batched", False),
+                **({"context": explanation["context"]} if shape.verbose else {}),
+                **({"error": explanation["error"]} if "error" in explanation else {}),
             }
         )
-    return {"user_id": user_id, "results": results}
+    return shape.respond({"user_id": user_id, "results": results})
 
 
-@router.post("/recommendations/{user_id}")
-def explain_recommendations(
+async def _prepare_recommendation_explanations(
+    repo: SupabaseRepository,
     user_id: str,
-    client: Client = Depends(get_supabase_client),
-    limit: int = Query(10, ge=1, le=50),
-    min_sentiment: float = Query(0.0, ge=0.0, le=1.0),
-    difficulty_filter: str | None = Query(None),
-    similarity_threshold: float = Query(0.0, ge=0.0, le=1.0),
-    explain_top: int = Query(3, ge=0, le=20),
-):
-    profile, preferences, user_embedding = _fetch_user_data(client, user_id)
-    # fetch user embedding
-    user_embed_resp = (
-        client.table("user_embeddings")
-        .select("embedding")
-        .eq("user_id", user_id)
-        .maybe_single()
-        .execute()
-    )
-    if not user_embed_resp or not getattr(user_embed_resp, "data", None):
+    limit: int,
+    min_sentiment: float,
+    difficulty_filter: str | None,
+    similarity_threshold: float,
+    explain_top: int,
+    debug: bool,
+) -> dict:
+    """
+    Vector search plus one context per explainable candidate, shared by the JSON
+    and SSE variants of explain_recommendations.
+    """
+    profile, preferences, user_embedding = await _fetch_user_data(repo, user_id)
+    # same deduplicated read as above, but a failed lookup raises here instead of degrading
+    user_embedding_row = await repo.user_row("user_embeddings", user_id)
+    if not user_embedding_row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User embedding not found. Run the embedding endpoint first.",
         )
-    query_embedding = user_embed_resp.data.get("embedding")
+    query_embedding = user_embedding_row.get("embedding")
     if not query_embedding:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,64 +180,143 @@ def explain_recommendations(
         )
 
     # vector search
-    search_resp = client.rpc("search_video_embeddings", {"query": query_embedding, "_limit": limit}).execute()
-    candidates = (search_resp.data if search_resp and getattr(search_resp, "data", None) else []) or []
-
-    accepted = []
-    rejected = []
-    for record in candidates:
-        reasons = []
-        sim = record.get("similarity") or 0.0
-        if sim < similarity_threshold:
-            reasons.append("similarity too low")
-        if difficulty_filter and record.get("difficulty") != difficulty_filter:
-            reasons.append("difficulty mismatch")
-        if record.get("sentiment_score") is not None and record.get("sentiment_score") < min_sentiment:
-            reasons.append("sentiment below threshold")
-
-        if reasons:
-            rejected.append({**record, "accepted": False, "rejection_reason": "; ".join(reasons)})
-        else:
-            accepted.append({**record, "accepted": True})
+    search = await asearch_video_embeddings_filtered(
+        repo.client,
+        query_embedding,
+        limit,
+        difficulty=difficulty_filter,
+        min_sentiment=min_sentiment,
+        min_similarity=similarity_threshold,
+        include_rejected=debug,
+    )
+    accepted = search["accepted"]
+    rejected = search["rejected"]
 
     explain_list = accepted[:explain_top] if explain_top >= 0 else accepted
 
-    explanations = []
+    videos = await _fetch_videos(repo, [rec["video_id"] for rec in explain_list])
+    to_explain = []
     for rec in explain_list:
-        vid = rec["video_id"]
-        try:
-            video = _fetch_video_data(client, vid)
-        except HTTPException:
+        if rec["video_id"] in videos:
+            to_explain.append(rec)
+        else:
             rejected.append({**rec, "accepted": False, "rejection_reason": "video metadata missing"})
-            continue
-        ctx = build_context_payload(
+
+    contexts = [
+        build_context_payload(
             user_id,
             profile,
             preferences,
             user_embedding,
-            video,
+            videos[rec["video_id"]],
             {
                 "similarity": rec.get("similarity"),
                 "min_sentiment": min_sentiment,
                 "difficulty_filter": difficulty_filter,
             },
         )
-        result = generate_explanation(ctx)
-        explanations.append(
-            {
-                "video_id": vid,
-                "similarity": rec.get("similarity"),
-                "difficulty": video.get("difficulty"),
-                "sentiment_score": video.get("sentiment_score"),
-                "topic_tags": video.get("topic_tags"),
-                "explanation": result["explanation"],
-                "usage": result["usage"],
-            }
-        )
-
+        for rec in to_explain
+    ]
     return {
-        "user_id": user_id,
         "accepted": accepted,
         "rejected": rejected,
-        "explanations": explanations,
+        "to_explain": to_explain,
+        "videos": videos,
+        "contexts": contexts,
     }
+
+
+def _explanation_item(rec: dict, video: dict, result: dict) -> dict:
+    return {
+        "video_id": rec["video_id"],
+        "similarity": rec.get("similarity"),
+        "difficulty": video.get("difficulty"),
+        "sentiment_score": video.get("sentiment_score"),
+        "topic_tags": video.get("topic_tags"),
+        "explanation": result["explanation"],
+        "usage": result["usage"],
+        "cached": result["cached"],
+        "batched": result.get("batched", False),
+        **({"error": result["error"]} if "error" in result else {}),
+    }
+
+
+@router.post("/recommendations/{user_id}", response_class=ORJSONResponse)
+async def explain_recommendations(
+    user_id: str,
+    repo: SupabaseRepository = Depends(get_repository),
+    limit: int = Query(10, ge=1, le=50),
+    min_sentiment: float = Query(0.0, ge=0.0, le=1.0),
+    difficulty_filter: str | None = Query(None),
+    similarity_threshold: float = Query(0.0, ge=0.0, le=1.0),
+    explain_top: int = Query(3, ge=0, le=20),
+    debug: bool = Query(False, description="Also return rejected candidates with reasons"),
+    batched: bool = Query(False, description="Explain all videos in shared-prompt JSON calls"),
+    shape: ResponseShape = Depends(),
+):
+    prepared = await _prepare_recommendation_explanations(
+        repo, user_id, limit, min_sentiment, difficulty_filter, similarity_threshold, explain_top, debug
+    )
+    results = await run_explanations(prepared["contexts"], batched=batched)
+    explanations = [
+        _explanation_item(rec, prepared["videos"][rec["video_id"]], result)
+        for rec, result in zip(prepared["to_explain"], results)
+    ]
+
+    return shape.respond(
+        {
+            "user_id": user_id,
+            "accepted": prepared["accepted"],
+            "rejected": prepared["rejected"],
+            "explanations": explanations,
+        }
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/recommendations/{user_id}/stream")
+async def stream_recommendation_explanations(
+    user_id: str,
+    repo: SupabaseRepository = Depends(get_repository),
+    limit: int = Query(10, ge=1, le=50),
+    min_sentiment: float = Query(0.0, ge=0.0, le=1.0),
+    difficulty_filter: str | None = Query(None),
+    similarity_threshold: float = Query(0.0, ge=0.0, le=1.0),
+    explain_top: int = Query(3, ge=0, le=20),
+    debug: bool = Query(False, description="Also return rejected candidates with reasons"),
+    stream_tokens: bool = Query(False, description="Also send each explanation's tokens as they arrive"),
+):
+    """
+    Server-sent events: `candidates` right after vector search, then one `explanation`
+    event per video in completion order (preceded by `token` events when
+    stream_tokens=true), then `done`.
+    """
+    prepared = await _prepare_recommendation_explanations(
+        repo, user_id, limit, min_sentiment, difficulty_filter, similarity_threshold, explain_top, debug
+    )
+
+    async def events():
+        yield _sse(
+            "candidates",
+            {"user_id": user_id, "accepted": prepared["accepted"], "rejected": prepared["rejected"]},
+        )
+        explained = failed = 0
+        async for event in astream_explanations(prepared["contexts"], stream_tokens=stream_tokens):
+            rec = prepared["to_explain"][event["index"]]
+            if event["type"] == "token":
+                yield _sse("token", {"video_id": rec["video_id"], "delta": event["delta"]})
+                continue
+            item = _explanation_item(rec, prepared["videos"][rec["video_id"]], event["result"])
+            failed += "error" in item
+            explained += "error" not in item
+            yield _sse("explanation", item)
+        yield _sse("done", {"user_id": user_id, "explained": explained, "failed": failed})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
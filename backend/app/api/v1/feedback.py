@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, field_validator
 from supabase import Client
 
+from app.services.recommendation_cache import bump_user_version
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
@@ -24,12 +25,14 @@ class FeedbackPayload(BaseModel):
 @router.post("")
 def submit_feedback(payload: FeedbackPayload, client: Client = Depends(get_supabase_client)):
     try:
-        client.table("recommendation_feedback").insert(
+        # stores the feedback row and bumps user_feedback_counts atomically
+        client.rpc(
+            "record_recommendation_feedback",
             {
-                "user_id": payload.user_id,
-                "video_id": payload.video_id,
-                "feedback_type": payload.feedback_type,
-            }
+                "_user_id": payload.user_id,
+                "_video_id": payload.video_id,
+                "_feedback_type": payload.feedback_type,
+            },
         ).execute()
     except Exception as exc:  # pragma: no cover
         raise HTTPException(
@@ -37,4 +40,5 @@ def submit_feedback(payload: FeedbackPayload, client: Client = Depends(get_supab
             detail=f"Failed to record feedback: {exc}",
         ) from exc
 
+    bump_user_version(payload.user_id)
     return {"status": "ok"}
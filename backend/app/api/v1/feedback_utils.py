@@ -1,5 +1,4 @@
-from collections import Counter
-from typing import Optional
+from typing import Dict, Optional
 
 from supabase import Client
 
@@ -19,17 +18,28 @@ def adjust_preferences_with_feedback(
     """
     try:
         resp = (
-            client.table("recommendation_feedback")
-            .select("feedback_type")
+            client.table("user_feedback_counts")
+            .select("helpful, not_helpful, too_easy, too_hard")
             .eq("user_id", user_id)
+            .maybe_single()
             .execute()
         )
-        rows = resp.data or []
+        counts = (resp.data if resp else None) or {}
     except Exception:
         return difficulty_filter, min_sentiment
 
-    counts = Counter(row.get("feedback_type") for row in rows)
+    return apply_feedback_counts(counts, difficulty_filter, min_sentiment)
 
+
+def apply_feedback_counts(
+    counts: Dict[str, int],
+    difficulty_filter: Optional[str],
+    min_sentiment: float,
+) -> tuple[Optional[str], float]:
+    """
+    The rules behind adjust_preferences_with_feedback, for callers that already
+    hold a user_feedback_counts row (batch precomputation).
+    """
     too_easy = counts.get("too_easy", 0)
     too_hard = counts.get("too_hard", 0)
     helpful = counts.get("helpful", 0)
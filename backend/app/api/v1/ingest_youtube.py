@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from supabase import Client
 
 from app.schemas.ingestion import YoutubeIngestRequest, YoutubeIngestResponse
+from app.services.cache import get_cache_stats
+from app.services.incremental import IngestState
 from app.services.supabase_client import get_supabase_client
 from app.services.youtube import fetch_youtube_metadata
 
@@ -16,6 +18,9 @@ def ingest_youtube(
     if not payload.topics:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="topics is required")
 
+    fetch_stats: dict = {}
+    # a refresh deletes the topic's rows, so there is nothing to be incremental against
+    ingest_state = IngestState(payload.freshness_hours) if payload.incremental and not payload.refresh else None
     try:
         videos = fetch_youtube_metadata(
             topics=payload.topics,
@@ -24,6 +29,8 @@ def ingest_youtube(
             max_age_days=payload.max_age_days,
             exclude_keywords=payload.exclude_keywords,
             order=payload.order,
+            stats=fetch_stats,
+            select_video_ids=ingest_state.selector(client) if ingest_state else None,
         )
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(
@@ -32,8 +39,17 @@ def ingest_youtube(
         ) from exc
 
     attempted = len(videos)
+    skipped_fresh = len(ingest_state.fresh_ids) if ingest_state else 0
     if not videos:
-        return YoutubeIngestResponse(inserted=0, attempted=0, skipped=0, topics=payload.topics)
+        return YoutubeIngestResponse(
+            inserted=0,
+            attempted=0,
+            skipped=0,
+            topics=payload.topics,
+            skipped_fresh=skipped_fresh,
+            api_calls=fetch_stats.get("api_calls", 0),
+            cache_hits=fetch_stats.get("cache_hits", 0),
+        )
 
     try:
         if payload.refresh:
@@ -55,4 +71,12 @@ def ingest_youtube(
         skipped=skipped,
         topics=payload.topics,
         video_ids=video_ids,
+        skipped_fresh=skipped_fresh,
+        api_calls=fetch_stats.get("api_calls", 0),
+        cache_hits=fetch_stats.get("cache_hits", 0),
     )
+
+
+@router.get("/cache-stats")
+def ingest_cache_stats():
+    return get_cache_stats()
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, status
+
+from app.schemas.ingestion import YoutubeIngestRequest
+from app.worker.jobs import get_job_store, new_job
+from app.worker.tasks import run_workflow
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("/workflow", status_code=status.HTTP_202_ACCEPTED)
+def submit_workflow_job(payload: YoutubeIngestRequest):
+    """
+    Queue ingest -> enrich -> embed on the Celery workers; poll GET /jobs/{job_id} for progress.
+    """
+    if not payload.topics:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="topics is required")
+
+    job_id = new_job("workflow", topics=",".join(payload.topics))
+    try:
+        run_workflow.delay(job_id, payload.model_dump())
+    except Exception as exc:  # noqa: BLE001
+        get_job_store().update(job_id, status="failed", error=str(exc))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to queue workflow job: {exc}",
+        ) from exc
+    return get_job_store().get(job_id)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    job = get_job_store().get(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No job with id {job_id}")
+    total = job.get("total_chunks", 0)
+    finished = job.get("completed_chunks", 0) + job.get("failed_chunks", 0)
+    return {**job, "progress": finished / total if total else (1.0 if job.get("status") == "completed" else 0.0)}
@@ -0,0 +1,50 @@
+from typing import Any, Callable, Dict, Optional
+
+import orjson
+from fastapi import Query
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON via orjson (fastapi.responses.ORJSONResponse is deprecated in newer FastAPI).
+    Also serializes numpy arrays and scalars, e.g. vectors straight from the index.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+class ResponseShape:
+    """
+    `verbose` / `fields` query parameters shared by the heavy routes. Compact (the
+    default) leaves out raw vectors, echoed prompt contexts and duplicated records;
+    `fields` keeps only the listed top-level keys.
+    """
+
+    def __init__(
+        self,
+        verbose: bool = Query(False, description="Include embeddings, echoed contexts and duplicated records"),
+        fields: Optional[str] = Query(None, description="Comma-separated top-level fields to return"),
+    ):
+        self.verbose = verbose
+        self.fields = {name.strip() for name in fields.split(",") if name.strip()} if fields else None
+
+    def respond(
+        self,
+        payload: Dict[str, Any],
+        compact: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ) -> ORJSONResponse:
+        if compact is not None and not self.verbose:
+            payload = compact(payload)
+        if self.fields is not None:
+            payload = {key: value for key, value in payload.items() if key in self.fields}
+        # returning the response directly skips FastAPI's jsonable_encoder pass
+        return ORJSONResponse(payload)
+
+
+def drop_keys(*keys: str) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    def compact(payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in payload.items() if key not in keys}
+
+    return compact
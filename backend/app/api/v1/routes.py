@@ -7,6 +7,7 @@ from app.api.v1.explanations import router as explanations_router
 from app.api.v1.feedback import router as feedback_router
 from app.api.v1.feedback_routes import router as feedback_debug_router
 from app.api.v1.ingest_youtube import router as ingest_youtube_router
+from app.api.v1.jobs import router as jobs_router
 from app.api.v1.workflow import router as workflow_router
 from app.api.v1.onboarding import router as onboarding_router
 from app.core.config import get_settings
@@ -17,6 +18,7 @@ router = APIRouter(prefix="/v1")
 router.include_router(onboarding_router)
 router.include_router(ingest_youtube_router)
 router.include_router(workflow_router)
+router.include_router(jobs_router)
 router.include_router(enrich_router)
 router.include_router(embeddings_router)
 router.include_router(explanations_router)
@@ -1,68 +1,123 @@
-﻿from fastapi import APIRouter, Depends, HTTPException
+﻿import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
 from supabase import Client
 
+from app.core.config import get_settings
 from app.schemas.ingestion import YoutubeIngestRequest
-from app.services.comments import fetch_top_comments
-from app.api.v1.embeddings import embed_user, embed_video
-from app.services.nlp import analyze_comments_sentiment, classify_difficulty, extract_topics
+from app.services.bulk_writer import FlushReport
+from app.services.enrichment import (
+    apply_enrichment,
+    attach_embeddings,
+    persist_enriched_videos,
+    safe_fetch_comments,
+)
+from app.services.ingestion import iter_ingest_for_enrichment
+from app.services.pipeline import Stage, StagedPipeline
 from app.services.supabase_client import get_supabase_client
-from app.services.youtube import fetch_youtube_metadata
 
 router = APIRouter(prefix="/workflow", tags=["workflow"])
 
 
+def _comments_stage(batch: List[Dict]) -> List[Dict]:
+    return [{**video, "comments": safe_fetch_comments(video["video_id"])} for video in batch]
+
+
+def _nlp_stage(batch: List[Dict]) -> List[Dict]:
+    comment_lists = [video.pop("comments", []) for video in batch]
+    return apply_enrichment(batch, comment_lists)
+
+
+def _embedding_stage(batch: List[Dict]) -> List[Dict]:
+    return attach_embeddings(batch)
+
+
+def _persistence_stage(client: Client, reports: Dict[str, FlushReport]):
+    lock = threading.Lock()
+
+    def persist(batch: List[Dict]) -> List[str]:
+        batch_reports = persist_enriched_videos(client, batch)
+        with lock:
+            for table, report in batch_reports.items():
+                reports.setdefault(table, FlushReport()).merge(report)
+        failed = set(batch_reports["videos_raw"].failed_keys)
+        return [video["video_id"] for video in batch if video["video_id"] not in failed]
+
+    return persist
+
+
+def build_enrichment_pipeline(client: Client, reports: Optional[Dict[str, FlushReport]] = None) -> StagedPipeline:
+    settings = get_settings()
+    reports = {} if reports is None else reports
+    return StagedPipeline(
+        [
+            Stage("comments", _comments_stage, concurrency=settings.comment_fetch_concurrency),
+            Stage("nlp", _nlp_stage, batch_size=settings.nlp_batch_size, batch_wait_seconds=0.1),
+            Stage("embedding", _embedding_stage, batch_size=settings.embedding_max_batch_size, batch_wait_seconds=0.05),
+            Stage(
+                "persistence",
+                _persistence_stage(client, reports),
+                concurrency=settings.pipeline_persist_concurrency,
+                batch_size=settings.pipeline_persist_batch_size,
+                batch_wait_seconds=settings.pipeline_persist_batch_wait_seconds,
+            ),
+        ],
+        queue_size=settings.pipeline_queue_size,
+    )
+
+
 @router.post("/onboarding-refresh")
 def onboarding_refresh(payload: YoutubeIngestRequest, client: Client = Depends(get_supabase_client)):
     """
-    One-shot pipeline: ingest (with optional refresh), enrich, embed, then return video_ids.
+    Streaming pipeline: ingest (with optional refresh) feeds each fetched and upserted page
+    straight into the comments -> NLP -> embedding -> persistence stages, which are connected
+    by bounded queues, so the YouTube fetch overlaps with enrichment. Returns enriched
+    video_ids plus per-stage timings.
     Note: user_id is not part of YoutubeIngestRequest; frontend should call embeddings/recs separately per user.
     """
     if not payload.topics:
         raise HTTPException(status_code=400, detail="topics is required")
 
-    videos = fetch_youtube_metadata(
-        topics=payload.topics,
-        max_results_per_topic=payload.max_results_per_topic,
-        min_view_count=payload.min_view_count,
-        max_age_days=payload.max_age_days,
-        exclude_keywords=payload.exclude_keywords,
-        order=payload.order,
-    )
+    started = time.perf_counter()
+    ingest: Dict[str, int] = {}
+    to_enrich: List[Dict] = []
+    fetch_finished: List[float] = []
+    first_fed: List[float] = []
+
+    def fetched_videos():
+        for video in iter_ingest_for_enrichment(client, payload, ingest):
+            if not first_fed:
+                first_fed.append(time.perf_counter())
+            to_enrich.append(video)
+            yield video
+        fetch_finished.append(time.perf_counter())
+
+    write_reports: Dict[str, FlushReport] = {}
+    pipeline = build_enrichment_pipeline(client, write_reports)
+    persisted = set(pipeline.run(fetched_videos()))
+    finished = time.perf_counter()
+    enriched_ids = [v["video_id"] for v in to_enrich if v["video_id"] in persisted]
+    fetch_seconds = fetch_finished[0] - started
+    stages = {
+        "fetch": {
+            "items_out": ingest["ingested"],
+            "wall_seconds": fetch_seconds,
+            "throughput_per_second": ingest["ingested"] / fetch_seconds if fetch_seconds else 0.0,
+        },
+        **pipeline.stats(),
+    }
 
-    if payload.refresh:
-        client.table("videos_raw").delete().contains("topics_source", payload.topics).execute()
-
-    if videos:
-        client.table("videos_raw").upsert(videos, on_conflict="video_id").execute()
-
-    enriched_ids = []
-    for v in videos:
-        vid = v.get("video_id")
-        if not vid:
-            continue
-        text = " ".join(filter(None, [v.get("title"), v.get("description")])).strip()
-        diff = classify_difficulty(text)
-        topics = extract_topics(text)
-        sentiment_score = None
-        comment_count = 0
-        try:
-            comments = fetch_top_comments(vid)
-            sentiment = analyze_comments_sentiment(comments)
-            sentiment_score = sentiment["score"]
-            comment_count = sentiment["count"]
-        except Exception:
-            pass
-        client.table("videos_raw").update(
-            {
-                "difficulty": diff["label"],
-                "difficulty_confidence": diff["score"],
-                "topic_tags": topics,
-                "sentiment_score": sentiment_score,
-                "comment_count_analyzed": comment_count,
-            }
-        ).eq("video_id", vid).execute()
-
-        embed_video(vid, client)
-        enriched_ids.append(vid)
-
-    return {"ingested": len(videos), "enriched": len(enriched_ids), "video_ids": enriched_ids}
+    return {
+        "ingested": ingest["ingested"],
+        "enriched": len(enriched_ids),
+        "skipped_fresh": ingest["skipped_fresh"],
+        "skipped_unchanged": ingest["skipped_unchanged"],
+        "video_ids": enriched_ids,
+        # from the first video handed to the pipeline, so it excludes the YouTube searches
+        "pipeline_seconds": finished - first_fed[0] if first_fed else 0.0,
+        "total_seconds": finished - started,
+        "stages": stages,
+        "writes": {table: report.as_dict() for table, report in write_reports.items()},
+    }
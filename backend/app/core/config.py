@@ -11,13 +11,79 @@ class Settings(BaseSettings):
     environment: str = "local"
     redis_url: str = "redis://localhost:6379/0"
     openai_api_key: str | None = None
+    openai_base_url: str | None = None  # any OpenAI-compatible endpoint, e.g. scripts/fake_openai_server.py
     huggingface_api_key: str | None = None
     youtube_api_key: str | None = None
+    youtube_api_base_url: str = "https://www.googleapis.com/youtube/v3"
+    youtube_concurrency: int = 5
+    youtube_search_cache_ttl_seconds: int = 3600
+    youtube_video_cache_ttl_seconds: int = 21600
+    ingest_freshness_hours: int = 24
+    celery_task_always_eager: bool = False
+    worker_chunk_size: int = 25
+    bulk_write_chunk_size: int = 500
+    worker_preload_models: bool = True
+    job_ttl_seconds: int = 86_400
+    cache_backend: str = "memory"  # memory | redis
+    cache_max_entries: int = 10_000
+    recommendation_cache_enabled: bool = True
+    recommendation_cache_ttl_seconds: int = 600
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_http2: bool = True
+    http_max_retries: int = 3
+    http_retry_backoff_seconds: float = 0.5
+    http_retry_max_backoff_seconds: float = 8.0
+    supabase_timeout_seconds: float = 30.0
     langfuse_host: str | None = None
     langfuse_public_key: str | None = None
     langfuse_secret_key: str | None = None
     explanation_model: str = "gpt-4o-mini"
     explanation_temperature: float = 0.2
+    explanation_concurrency: int = 5
+    explanation_timeout_seconds: float = 20.0
+    explanation_batch_size: int = 10
+    explanation_batch_timeout_seconds: float = 60.0
+    explanation_cache_enabled: bool = True
+    explanation_cache_ttl_seconds: int = 7 * 86_400
+    explanation_cache_similarity_bucket: float = 0.05
+    inference_backend: str = "torch"  # torch | onnx
+    onnx_model_dir: str = "models/onnx"
+    onnx_quantize: bool = False
+    onnx_quantization_config: str = "avx512_vnni"  # arm64 | avx2 | avx512 | avx512_vnni
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_batching_enabled: bool = True
+    embedding_batch_window_ms: float = 5.0
+    embedding_max_batch_size: int = 32
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = ".cache/embeddings.sqlite3"
+    embedding_cache_max_entries: int = 200_000
+    nlp_batch_size: int = 8
+    enrichment_mode: str = "zero_shot"  # zero_shot | fast
+    fast_topic_threshold: float = 0.35
+    fast_difficulty_temperature: float = 0.05
+    comment_fetch_concurrency: int = 8
+    pipeline_queue_size: int = 64
+    pipeline_persist_concurrency: int = 2
+    pipeline_persist_batch_size: int = 500  # rows per persistence batch (each table chunked by bulk_write_chunk_size)
+    pipeline_persist_batch_wait_seconds: float = 0.2
+    precompute_top_k: int = 20
+    precompute_user_block: int = 512
+    precompute_video_block: int = 50_000
+    precompute_max_age_hours: int = 26
+    search_overfetch_factor: int = 3
+    search_max_candidates: int = 1000
+    pgvector_ef_search: int = 40  # HNSW recall/latency knob, see sql/embeddings_ann_index.sql
+    pgvector_probes: int = 10  # IVFFlat lists scanned per query
+    vector_index_backend: str = "rpc"  # rpc | numpy | hnsw
+    vector_index_refresh_seconds: int = 900
+    vector_index_page_size: int = 1000
+    vector_index_hnsw_m: int = 16
+    vector_index_hnsw_ef_construction: int = 200
+    vector_index_hnsw_ef_search: int = 64
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -1,13 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import api_router
 from app.core.config import get_settings
+from app.services.http_client import close_http_clients, open_http_clients
+from app.services.supabase_client import close_async_supabase_client, get_async_supabase_client
+from app.worker.celery_app import preload_models
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_http_clients()
+    await get_async_supabase_client()
+    if get_settings().celery_task_always_eager:
+        # eager jobs run their model tasks in this process
+        await asyncio.to_thread(preload_models)
+    try:
+        yield
+    finally:
+        await close_async_supabase_client()
+        close_http_clients()
 
 
 def get_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(title=settings.app_name, lifespan=lifespan)
     allowed_origins = [
         "http://localhost:3000",
         "https://localhost:3000",
@@ -0,0 +1,14 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class VideoBatchEmbeddingRequest(BaseModel):
+    video_ids: List[str] = Field(min_length=1, max_length=5000)
+
+
+class VideoBatchEmbeddingResponse(BaseModel):
+    embedded: int
+    missing: List[str] = Field(default_factory=list)
+    empty: List[str] = Field(default_factory=list)
+    failed: List[str] = Field(default_factory=list)
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class VideoEnrichmentResult(BaseModel):
@@ -10,3 +10,14 @@ class VideoEnrichmentResult(BaseModel):
     sentiment_score: Optional[float]
     comment_count_analyzed: int
     topic_tags: List[str]
+
+
+class VideoBatchEnrichmentRequest(BaseModel):
+    video_ids: List[str] = Field(min_length=1, max_length=5000)
+
+
+class VideoBatchEnrichmentResponse(BaseModel):
+    enriched: int
+    results: List[VideoEnrichmentResult] = Field(default_factory=list)
+    missing: List[str] = Field(default_factory=list)
+    failed: List[str] = Field(default_factory=list)
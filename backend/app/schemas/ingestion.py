@@ -9,6 +9,8 @@ class YoutubeIngestRequest(BaseModel):
     min_view_count: int = Field(0, ge=0)
     max_age_days: Optional[int] = Field(365, ge=1)
     refresh: bool = False
+    incremental: bool = False
+    freshness_hours: Optional[int] = Field(None, ge=0)
     order: str = Field("relevance", pattern="^(relevance|date)$")
     exclude_keywords: List[str] = Field(
         default_factory=lambda: ["trailer", "official music video", "lyrics", "remix", "promo"]
@@ -21,3 +23,6 @@ class YoutubeIngestResponse(BaseModel):
     skipped: int
     topics: List[str]
     video_ids: List[str] = Field(default_factory=list)
+    skipped_fresh: int = 0
+    api_calls: int = 0
+    cache_hits: int = 0
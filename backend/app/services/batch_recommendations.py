@@ -0,0 +1,243 @@
+import datetime as dt
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from supabase import Client
+
+from app.api.v1.feedback_utils import apply_feedback_counts
+from app.core.config import get_settings
+from app.services.bulk_writer import BulkUpserter
+from app.services.supabase_client import iter_table_pages
+from app.services.vector_index import EMBEDDING_DIM, normalize_rows, parse_vector
+
+logger = logging.getLogger(__name__)
+
+
+class VideoCatalog:
+    """
+    Every video embedding as one float32 matrix plus column arrays for the filters
+    (~1.5 GB of vectors per 1M videos). Difficulty is stored as small integer codes.
+    Filter columns come from videos_raw (add_metadata), the source of truth that
+    re-enrichment updates, not from the copies on video_embeddings.
+    """
+
+    def __init__(self, capacity: int):
+        self.embeddings = np.zeros((max(capacity, 1), EMBEDDING_DIM), dtype=np.float32)
+        self.sentiment = np.full(max(capacity, 1), np.nan, dtype=np.float32)
+        self.difficulty = np.zeros(max(capacity, 1), dtype=np.int16)
+        self.difficulty_codes: Dict[Optional[str], int] = {None: 0}
+        self.difficulty_names: Dict[int, Optional[str]] = {}
+        self.video_ids: List[str] = []
+        self.topics: List[List[str]] = []
+        self._index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.video_ids)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self.embeddings.shape[0]
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        self.embeddings = np.resize(self.embeddings, (capacity, EMBEDDING_DIM))
+        self.sentiment = np.resize(self.sentiment, capacity)
+        self.difficulty = np.resize(self.difficulty, capacity)
+
+    def add(self, rows: List[Dict[str, Any]]) -> None:
+        self._grow(len(self.video_ids) + len(rows))
+        for row in rows:
+            vector = parse_vector(row.get("embedding"))
+            if vector is None or vector.shape[0] != EMBEDDING_DIM:
+                continue
+            idx = len(self.video_ids)
+            self.embeddings[idx] = vector
+            # unknown until add_metadata: NaN sentiment, no difficulty, no topics
+            self.sentiment[idx] = np.nan
+            self.difficulty[idx] = 0
+            self._index[row["video_id"]] = idx
+            self.video_ids.append(row["video_id"])
+            self.topics.append([])
+
+    def add_metadata(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Join videos_raw rows (difficulty, sentiment_score, topic_tags) by video_id;
+        videos without an embedding are ignored.
+        """
+        for row in rows:
+            idx = self._index.get(row["video_id"])
+            if idx is None:
+                continue
+            sentiment = row.get("sentiment_score")
+            self.sentiment[idx] = np.nan if sentiment is None else float(sentiment)
+            difficulty = row.get("difficulty")
+            self.difficulty[idx] = self.difficulty_codes.setdefault(difficulty, len(self.difficulty_codes))
+            self.topics[idx] = row.get("topic_tags") or []
+
+    def finalize(self) -> None:
+        size = len(self.video_ids)
+        self.embeddings = normalize_rows(self.embeddings[:size])
+        self.sentiment = self.sentiment[:size]
+        self.difficulty = self.difficulty[:size]
+        self.difficulty_names = {code: name for name, code in self.difficulty_codes.items()}
+        self._index = {}
+
+    def allowed_mask(self, difficulty_filter: Optional[str], min_sentiment: float) -> np.ndarray:
+        # mirrors rejection_reasons in vector_search: unknown sentiment passes
+        mask = np.isnan(self.sentiment) | (self.sentiment >= min_sentiment)
+        if difficulty_filter:
+            code = self.difficulty_codes.get(difficulty_filter)
+            mask &= self.difficulty == code if code is not None else False
+        return mask
+
+    def record(self, idx: int, similarity: float) -> Dict[str, Any]:
+        sentiment = self.sentiment[idx]
+        return {
+            "video_id": self.video_ids[idx],
+            "similarity": float(similarity),
+            "difficulty": self.difficulty_names.get(int(self.difficulty[idx])),
+            "sentiment_score": None if np.isnan(sentiment) else float(sentiment),
+            "topic_tags": self.topics[idx],
+        }
+
+
+def load_catalog(client: Client, page_size: int) -> VideoCatalog:
+    resp = client.table("video_embeddings").select("video_id", count="exact").limit(1).execute()
+    catalog = VideoCatalog(capacity=getattr(resp, "count", None) or page_size)
+    for rows in iter_table_pages(client, "video_embeddings", "video_id, embedding", "video_id", page_size):
+        catalog.add(rows)
+    for rows in iter_table_pages(
+        client, "videos_raw", "video_id, difficulty, sentiment_score, topic_tags", "video_id", page_size
+    ):
+        catalog.add_metadata(rows)
+    catalog.finalize()
+    return catalog
+
+
+def load_feedback_counts(client: Client, page_size: int) -> Dict[str, Dict[str, int]]:
+    counts: Dict[str, Dict[str, int]] = {}
+    for rows in iter_table_pages(
+        client, "user_feedback_counts", "user_id, helpful, not_helpful, too_easy, too_hard", "user_id", page_size
+    ):
+        for row in rows:
+            counts[row["user_id"]] = row
+    return counts
+
+
+def blocked_top_k(
+    users: np.ndarray,
+    videos: np.ndarray,
+    group_masks: np.ndarray,
+    groups: np.ndarray,
+    k: int,
+    video_block: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k video indices and scores for each row of `users` (unit vectors), scanning
+    `videos` in column blocks so only a [users x video_block] score matrix exists at a
+    time. User u may only see videos where `group_masks[groups[u]]` is True; the rest
+    score -inf. Masks are shared per filter combination, not stored per user.
+    """
+    n_users = users.shape[0]
+    k = min(k, videos.shape[0])
+    best_scores = np.full((n_users, k), -np.inf, dtype=np.float32)
+    best_idx = np.full((n_users, k), -1, dtype=np.int64)
+    rows = np.arange(n_users)[:, None]
+
+    for start in range(0, videos.shape[0], video_block):
+        stop = min(start + video_block, videos.shape[0])
+        scores = users @ videos[start:stop].T
+        scores[~group_masks[groups, start:stop]] = -np.inf
+
+        block_k = min(k, stop - start)
+        top = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+        merged_scores = np.concatenate([best_scores, scores[rows, top]], axis=1)
+        merged_idx = np.concatenate([best_idx, top + start], axis=1)
+        keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+        best_scores = merged_scores[rows, keep]
+        best_idx = merged_idx[rows, keep]
+
+    order = np.argsort(-best_scores, axis=1)
+    return best_idx[rows, order], best_scores[rows, order]
+
+
+def precompute_recommendations(client: Client, top_k: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Top-k recommendations for every user with an embedding, written to
+    precomputed_recommendations. Applies the same feedback-adjusted difficulty and
+    sentiment filters as recommend_videos (with default query parameters). Users are
+    streamed in pages of PRECOMPUTE_USER_BLOCK and scored against the catalog in blocks
+    of PRECOMPUTE_VIDEO_BLOCK, so memory is the catalog plus one score block.
+    """
+    settings = get_settings()
+    top_k = top_k or settings.precompute_top_k
+    started = time.perf_counter()
+
+    catalog = load_catalog(client, settings.vector_index_page_size)
+    feedback = load_feedback_counts(client, settings.vector_index_page_size)
+    load_seconds = time.perf_counter() - started
+    computed_at = dt.datetime.now(dt.timezone.utc).isoformat()
+
+    mask_groups: Dict[Tuple[Optional[str], float], int] = {}
+    masks: List[np.ndarray] = []
+    users_done = 0
+    with BulkUpserter(client, "precomputed_recommendations", on_conflict="user_id") as writer:
+        for rows in iter_table_pages(
+            client, "user_embeddings", "user_id, embedding", "user_id", settings.precompute_user_block
+        ):
+            user_ids, vectors, filters = [], [], []
+            for row in rows:
+                vector = parse_vector(row.get("embedding"))
+                if vector is None or vector.shape[0] != EMBEDDING_DIM:
+                    continue
+                user_ids.append(row["user_id"])
+                vectors.append(vector)
+                filters.append(apply_feedback_counts(feedback.get(row["user_id"], {}), None, 0.0))
+            if not user_ids or not len(catalog):
+                continue
+
+            for key in filters:
+                if key not in mask_groups:
+                    mask_groups[key] = len(masks)
+                    masks.append(catalog.allowed_mask(*key))
+            idx, scores = blocked_top_k(
+                normalize_rows(np.asarray(vectors, dtype=np.float32)),
+                catalog.embeddings,
+                np.stack(masks),
+                np.asarray([mask_groups[key] for key in filters]),
+                top_k,
+                settings.precompute_video_block,
+            )
+
+            for user_id, (difficulty_filter, min_sentiment), user_idx, user_scores in zip(
+                user_ids, filters, idx, scores
+            ):
+                # recommend_videos' default similarity_threshold=0 also drops negative similarities
+                recommendations = [
+                    catalog.record(int(i), score)
+                    for i, score in zip(user_idx, user_scores)
+                    if np.isfinite(score) and score >= 0.0
+                ]
+                writer.add(
+                    {
+                        "user_id": user_id,
+                        "recommendations": recommendations,
+                        "difficulty_filter": difficulty_filter,
+                        "min_sentiment": min_sentiment,
+                        "catalog_size": len(catalog),
+                        "computed_at": computed_at,
+                    }
+                )
+            users_done += len(user_ids)
+            logger.info("precomputed recommendations for %d users", users_done)
+
+    return {
+        "users": users_done,
+        "videos": len(catalog),
+        "top_k": top_k,
+        "computed_at": computed_at,
+        "load_seconds": load_seconds,
+        "total_seconds": time.perf_counter() - started,
+        "writes": writer.report.as_dict(),
+    }
@@ -0,0 +1,132 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+from supabase import Client
+
+from app.core.config import get_settings
+
+
+class FlushReport:
+    def __init__(self):
+        self.written = 0
+        self.chunks = 0
+        self.failed_chunks = 0
+        self.retried_chunks = 0
+        self.failed_keys: List[str] = []
+        self.errors: List[str] = []
+
+    def merge(self, other: "FlushReport") -> None:
+        self.written += other.written
+        self.chunks += other.chunks
+        self.failed_chunks += other.failed_chunks
+        self.retried_chunks += other.retried_chunks
+        self.failed_keys.extend(other.failed_keys)
+        self.errors.extend(other.errors)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "written": self.written,
+            "chunks": self.chunks,
+            "failed_chunks": self.failed_chunks,
+            "retried_chunks": self.retried_chunks,
+            "failed_keys": list(self.failed_keys),
+            "errors": self.errors[:5],
+        }
+
+
+class BulkUpserter:
+    """
+    Buffers rows for one table and writes them as chunked multi-row upserts.
+    A chunk that fails is bisected and retried so bad rows are isolated in
+    O(log n) extra calls; rows that still fail are reported by key instead of raising.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        table: str,
+        on_conflict: str,
+        key: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        self.client = client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.key = key or on_conflict
+        self.chunk_size = max(chunk_size or get_settings().bulk_write_chunk_size, 1)
+        self.report = FlushReport()
+        self._rows: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, row: Dict) -> None:
+        self.extend([row])
+
+    def extend(self, rows: Iterable[Dict]) -> None:
+        ready: List[List[Dict]] = []
+        with self._lock:
+            for row in rows:
+                # later rows for the same key win, matching upsert semantics
+                self._rows.pop(row[self.key], None)
+                self._rows[row[self.key]] = row
+                if len(self._rows) >= self.chunk_size:
+                    ready.append(list(self._rows.values()))
+                    self._rows = {}
+        for chunk in ready:
+            self._write(chunk)
+
+    def flush(self) -> FlushReport:
+        with self._lock:
+            pending = list(self._rows.values())
+            self._rows = {}
+        for start in range(0, len(pending), self.chunk_size):
+            self._write(pending[start : start + self.chunk_size])
+        return self.report
+
+    def _upsert(self, rows: List[Dict]) -> None:
+        self.client.table(self.table).upsert(rows, on_conflict=self.on_conflict).execute()
+
+    def _write_split(self, rows: List[Dict], result: FlushReport) -> None:
+        try:
+            self._upsert(rows)
+            result.written += len(rows)
+        except Exception as exc:  # noqa: BLE001
+            if len(rows) == 1:
+                result.failed_keys.append(rows[0][self.key])
+                result.errors.append(f"{self.table}[{rows[0][self.key]}]: {exc}")
+                return
+            middle = len(rows) // 2
+            self._write_split(rows[:middle], result)
+            self._write_split(rows[middle:], result)
+
+    def _write(self, chunk: List[Dict]) -> None:
+        result = FlushReport()
+        result.chunks = 1
+        try:
+            self._upsert(chunk)
+            result.written = len(chunk)
+        except httpx.TransportError as exc:
+            # the API is unreachable; bisecting would only multiply failing calls
+            result.failed_chunks = 1
+            result.errors.append(f"{self.table}: {exc}")
+            result.failed_keys.extend(row[self.key] for row in chunk)
+        except Exception as exc:  # noqa: BLE001
+            if len(chunk) > 1:
+                result.retried_chunks = 1
+                middle = len(chunk) // 2
+                self._write_split(chunk[:middle], result)
+                self._write_split(chunk[middle:], result)
+            else:
+                result.failed_keys.append(chunk[0][self.key])
+            # a chunk only failed if bisection could not write every row
+            if result.failed_keys:
+                result.failed_chunks = 1
+                result.errors.insert(0, f"{self.table}: {exc}")
+        with self._lock:
+            self.report.merge(result)
+
+    def __enter__(self) -> "BulkUpserter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.config import get_settings
+
+
+class _CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def record(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "sets": self.sets,
+                "evictions": self.evictions,
+            }
+
+
+class _AsyncCacheMixin:
+    """
+    Awaitable variants for code running on an event loop (e.g. the shared HTTP loop).
+    Backends doing blocking network I/O set `blocking` so calls run in a worker thread
+    instead of stalling every other coroutine on the loop.
+    """
+
+    blocking = False
+
+    async def _call(self, method, *args):
+        if self.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await self._call(self.get, key)
+
+    async def aset(self, key: str, value: Any, ttl_seconds: float) -> None:
+        await self._call(self.set, key, value, ttl_seconds)
+
+    async def aget_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return await self._call(self.get_many, list(keys))
+
+    async def aset_many(self, items: Dict[str, Any], ttl_seconds: float) -> None:
+        if items:
+            await self._call(self.set_many, items, ttl_seconds)
+
+
+class MemoryTTLCache(_AsyncCacheMixin):
+    """
+    In-process LRU with per-entry expiry. Values are stored as-is; callers must not mutate them.
+    """
+
+    backend = "memory"
+
+    def __init__(self, namespace: str, max_entries: int):
+        self.namespace = namespace
+        self.max_entries = max(max_entries, 1)
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self._stats.record("misses")
+                return None
+            self._data.move_to_end(key)
+        self._stats.record("hits")
+        return entry[1]
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        self._stats.record("sets")
+        if evicted:
+            self._stats.record("evictions", evicted)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: float) -> None:
+        for key, value in items.items():
+            self.set(key, value, ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._data)
+        return {"backend": self.backend, "entries": entries, **self._stats.as_dict()}
+
+
+class RedisTTLCache(_AsyncCacheMixin):
+    """
+    Redis-backed cache shared across API and worker processes. Values are JSON encoded;
+    expiry is handled by Redis, eviction by the server's maxmemory policy.
+    """
+
+    backend = "redis"
+    blocking = True
+
+    def __init__(self, namespace: str, redis_url: str):
+        import redis
+
+        self.namespace = namespace
+        self._redis = redis.Redis.from_url(redis_url)
+        self._stats = _CacheStats()
+
+    def _key(self, key: str) -> str:
+        return f"learntube:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._redis.get(self._key(key))
+        if raw is None:
+            self._stats.record("misses")
+            return None
+        self._stats.record("hits")
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._redis.set(self._key(key), json.dumps(value), ex=max(int(ttl_seconds), 1))
+        self._stats.record("sets")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        raws = self._redis.mget([self._key(key) for key in keys])
+        found = {key: json.loads(raw) for key, raw in zip(keys, raws) if raw is not None}
+        self._stats.record("hits", len(found))
+        self._stats.record("misses", len(keys) - len(found))
+        return found
+
+    def set_many(self, items: Dict[str, Any], ttl_seconds: float) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(self._key(key), json.dumps(value), ex=max(int(ttl_seconds), 1))
+        pipe.execute()
+        self._stats.record("sets", len(items))
+
+    def delete(self, key: str) -> None:
+        self._redis.delete(self._key(key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, **self._stats.as_dict()}
+
+
+_caches: Dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str):
+    """
+    Cache for one namespace, using the backend selected by settings.cache_backend.
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            settings = get_settings()
+            if settings.cache_backend == "redis":
+                cache = RedisTTLCache(namespace, settings.redis_url)
+            else:
+                cache = MemoryTTLCache(namespace, settings.cache_max_entries)
+            _caches[namespace] = cache
+        return cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {namespace: cache.stats() for namespace, cache in caches.items()}
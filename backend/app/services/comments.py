@@ -1,8 +1,7 @@
 from typing import List, Optional
 
-import httpx
-
 from app.core.config import get_settings
+from app.services.http_client import get_http_client
 
 
 def fetch_top_comments(video_id: str, max_results: int = 10) -> List[str]:
@@ -20,11 +19,10 @@ def fetch_top_comments(video_id: str, max_results: int = 10) -> List[str]:
         "textFormat": "plainText",
     }
 
-    url = "https://www.googleapis.com/youtube/v3/commentThreads"
-    with httpx.Client(timeout=10) as client:
-        resp = client.get(url, params=params)
-        resp.raise_for_status()
-        items = resp.json().get("items", [])
+    url = f"{settings.youtube_api_base_url}/commentThreads"
+    resp = get_http_client().get(url, params=params)
+    resp.raise_for_status()
+    items = resp.json().get("items", [])
 
     comments: List[str] = []
     for item in items:
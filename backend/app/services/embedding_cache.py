@@ -0,0 +1,125 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from app.core.config import get_settings
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+    payload = f"{model_name}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding store on SQLite. Vectors are kept as float32 blobs
+    (the model's native precision) and evicted least-recently-used past max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max(max_entries, 1)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute(
+            """
+            create table if not exists embedding_cache (
+              key text primary key,
+              vector blob not null,
+              last_access real not null
+            )
+            """
+        )
+        self._conn.execute(
+            "create index if not exists idx_embedding_cache_last_access on embedding_cache(last_access)"
+        )
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"select key, vector from embedding_cache where key in ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "update embedding_cache set last_access = ? where key = ?",
+                    [(now, key) for key in found],
+                )
+            self._hits += len(found)
+            self._misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+        with self._lock:
+            self._conn.executemany(
+                "insert or replace into embedding_cache(key, vector, last_access) values (?, ?, ?)",
+                rows,
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("select count(*) from embedding_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            """
+            delete from embedding_cache where key in (
+              select key from embedding_cache order by last_access asc limit ?
+            )
+            """,
+            (overflow,),
+        )
+        self._evictions += overflow
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            (entries,) = self._conn.execute("select count(*) from embedding_cache").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": entries,
+                "max_entries": self.max_entries,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    return EmbeddingCache(settings.embedding_cache_path, settings.embedding_cache_max_entries)
@@ -1,16 +1,184 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Tuple
 
 from sentence_transformers import SentenceTransformer
 
+from app.core.config import get_settings
+from app.services.embedding_cache import cache_key, get_embedding_cache
+from app.services.model_backend import load_embedder
+
 
 @lru_cache(maxsize=1)
 def _get_embedder() -> SentenceTransformer:
-    return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    return load_embedder()
+
+
+class _MicroBatcher:
+    """
+    Collects concurrent embedding requests for a short window and encodes them
+    in one forward pass. Request threads block on a Future per text.
+    """
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_batch_size = max(max_batch_size, 1)
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "max_batch_size": 0,
+            "total_queue_wait_ms": 0.0,
+            "max_queue_wait_ms": 0.0,
+        }
+
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats)
+        batches = stats["batches"] or 1
+        items = stats["items"] or 1
+        stats["avg_batch_size"] = stats["items"] / batches
+        stats["avg_queue_wait_ms"] = stats["total_queue_wait_ms"] / items
+        stats["pending"] = self._queue.qsize()
+        return stats
+
+    def _ensure_worker(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._worker.start()
+
+    def _collect(self) -> List[Tuple[str, Future, float]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            texts = [text for text, _, _ in batch]
+            try:
+                vectors = _encode(texts)
+            except Exception as exc:  # noqa: BLE001
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+
+            waits = [(started - enqueued) * 1000.0 for _, _, enqueued in batch]
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(batch)
+                self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+                self._stats["total_queue_wait_ms"] += sum(waits)
+                self._stats["max_queue_wait_ms"] = max(self._stats["max_queue_wait_ms"], max(waits))
+
+            for (_, future, _), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+@lru_cache(maxsize=1)
+def _get_batcher() -> _MicroBatcher:
+    settings = get_settings()
+    return _MicroBatcher(
+        window_ms=settings.embedding_batch_window_ms,
+        max_batch_size=settings.embedding_max_batch_size,
+    )
+
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    model = _get_embedder()
+    settings = get_settings()
+    vectors = model.encode(
+        texts,
+        batch_size=settings.embedding_max_batch_size,
+        normalize_embeddings=True,
+    )
+    return [vector.tolist() for vector in vectors]
+
+
+def _encode_uncached(texts: List[str]) -> List[List[float]]:
+    settings = get_settings()
+    if not settings.embedding_batching_enabled:
+        return _encode(texts)
+    batcher = _get_batcher()
+    futures = [batcher.submit(text) for text in texts]
+    return [future.result() for future in futures]
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """
+    Embed many texts at once. Empty strings map to empty vectors, mirroring embed_text.
+    Cached vectors are served from the on-disk cache; misses share the micro-batch
+    queue with concurrent callers.
+    """
+    results: List[List[float]] = [[] for _ in texts]
+    pending = [(idx, text) for idx, text in enumerate(texts) if text]
+    if not pending:
+        return results
+
+    cache = get_embedding_cache()
+    if cache is None:
+        vectors = _encode_uncached([text for _, text in pending])
+        for (idx, _), vector in zip(pending, vectors):
+            results[idx] = vector
+        return results
+
+    settings = get_settings()
+    # the backend and precision change the vectors, so they are part of the model identity
+    model_name = (
+        f"{settings.embedding_model}|{settings.inference_backend}|{'int8' if settings.onnx_quantize else 'fp32'}"
+    )
+    keys = {idx: cache_key(model_name, text) for idx, text in pending}
+    cached = cache.get_many(keys.values())
+
+    misses: Dict[str, str] = {}
+    for idx, text in pending:
+        if keys[idx] not in cached:
+            misses.setdefault(keys[idx], text)
+
+    if misses:
+        vectors = _encode_uncached(list(misses.values()))
+        fresh = dict(zip(misses.keys(), vectors))
+        cache.put_many(fresh)
+        cached.update(fresh)
+
+    for idx, _ in pending:
+        results[idx] = cached[keys[idx]]
+    return results
 
 
 def embed_text(text: str) -> List[float]:
     if not text:
         return []
-    model = _get_embedder()
-    return model.encode(text, normalize_embeddings=True).tolist()
+    return embed_texts([text])[0]
+
+
+def get_embedding_stats() -> Dict[str, Dict[str, float]]:
+    cache = get_embedding_cache()
+    return {
+        "batcher": _get_batcher().stats(),
+        "cache": cache.stats() if cache else {"enabled": False},
+    }
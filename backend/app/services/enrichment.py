@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.services.bulk_writer import BulkUpserter, FlushReport
+from app.services.comments import fetch_top_comments
+from app.services.embeddings import embed_texts
+from app.services.nlp import analyze_comments_sentiment_batch, enrich_texts
+from app.services.vector_search import publish_video_embeddings
+
+# PostgREST puts `in.(...)` filters in the URL, so keep id lists short per request.
+ID_QUERY_CHUNK = 200
+
+ENRICHMENT_FIELDS = (
+    "difficulty",
+    "difficulty_confidence",
+    "topic_tags",
+    "sentiment_score",
+    "comment_count_analyzed",
+)
+
+
+def video_text(video: Dict) -> str:
+    return " ".join(filter(None, [video.get("title"), video.get("description")])).strip()
+
+
+def video_embedding_text(video: Dict[str, Any]) -> str:
+    parts = [
+        video.get("title"),
+        video.get("description"),
+    ]
+    tags = video.get("topic_tags") or []
+    if tags:
+        parts.append(" ".join(tags))
+    return " ".join(filter(None, parts)).strip()
+
+
+def safe_fetch_comments(video_id: str) -> List[str]:
+    try:
+        return fetch_top_comments(video_id)
+    except Exception:
+        # If comments fail to load, the video keeps default sentiment values
+        return []
+
+
+def fetch_comments_many(video_ids: List[str]) -> List[List[str]]:
+    if not video_ids:
+        return []
+    settings = get_settings()
+    workers = max(1, min(settings.comment_fetch_concurrency, len(video_ids)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(safe_fetch_comments, video_ids))
+
+
+def apply_enrichment(videos: List[Dict], comment_lists: List[List[str]]) -> List[Dict]:
+    """
+    Batched zero-shot + sentiment inference; returns copies of `videos` with the
+    enrichment columns filled in.
+    """
+    if not videos:
+        return []
+    nlp_results = enrich_texts([video_text(video) for video in videos])
+    sentiments = analyze_comments_sentiment_batch(comment_lists)
+    return [
+        {
+            **video,
+            "difficulty": nlp_result["difficulty"]["label"],
+            "difficulty_confidence": nlp_result["difficulty"]["score"],
+            "topic_tags": nlp_result["topics"],
+            "sentiment_score": sentiment["score"],
+            "comment_count_analyzed": sentiment["count"],
+        }
+        for video, nlp_result, sentiment in zip(videos, nlp_results, sentiments)
+    ]
+
+
+def enrich_videos(videos: List[Dict]) -> List[Dict]:
+    """
+    Difficulty, topics and comment sentiment for many `videos_raw` rows using batched
+    inference. Returns one update payload per video, in input order.
+    """
+    comment_lists = fetch_comments_many([video["video_id"] for video in videos])
+    return [
+        {"video_id": video["video_id"], **{field: video[field] for field in ENRICHMENT_FIELDS}}
+        for video in apply_enrichment(videos, comment_lists)
+    ]
+
+
+def attach_embeddings(videos: List[Dict]) -> List[Dict]:
+    """
+    Embed enriched rows in memory (title, description, topic tags) without re-reading videos_raw.
+    """
+    embeddings = embed_texts([video_embedding_text(video) for video in videos])
+    return [{**video, "embedding": embedding} for video, embedding in zip(videos, embeddings)]
+
+
+def enrichment_row(video: Dict) -> Dict:
+    # upsert needs the NOT NULL title even though the row already exists
+    return {"video_id": video["video_id"], "title": video["title"], **{field: video[field] for field in ENRICHMENT_FIELDS}}
+
+
+def embedding_row(video: Dict) -> Dict:
+    return {
+        "video_id": video["video_id"],
+        "embedding": video["embedding"],
+        "topics": video.get("topic_tags") or [],
+        "difficulty": video.get("difficulty"),
+        "sentiment_score": video.get("sentiment_score"),
+    }
+
+
+def load_videos(client: Client, video_ids: List[str], columns: str) -> List[Dict]:
+    rows: List[Dict] = []
+    for start in range(0, len(video_ids), ID_QUERY_CHUNK):
+        resp = client.table("videos_raw").select(columns).in_("video_id", video_ids[start : start + ID_QUERY_CHUNK]).execute()
+        rows.extend(resp.data or [])
+    return rows
+
+
+def persist_enriched_videos(client: Client, videos: List[Dict]) -> Dict[str, FlushReport]:
+    """
+    Write enrichment columns and embeddings as chunked multi-row upserts.
+    Failed rows are reported per table rather than raised.
+    """
+    with BulkUpserter(client, "videos_raw", on_conflict="video_id") as enrichment_writer:
+        enrichment_writer.extend(enrichment_row(video) for video in videos)
+    failed = set(enrichment_writer.report.failed_keys)
+    rows = [embedding_row(video) for video in videos if video.get("embedding") and video["video_id"] not in failed]
+    with BulkUpserter(client, "video_embeddings", on_conflict="video_id") as embedding_writer:
+        embedding_writer.extend(rows)
+    embedding_failed = set(embedding_writer.report.failed_keys)
+    publish_video_embeddings([row for row in rows if row["video_id"] not in embedding_failed])
+    return {"videos_raw": enrichment_writer.report, "video_embeddings": embedding_writer.report}
@@ -0,0 +1,74 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.cache import get_cache
+
+EMPTY_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def _bucket(value: Any, step: float) -> Optional[float]:
+    if value is None:
+        return None
+    return round(round(float(value) / step) * step, 4)
+
+
+def explanation_cache_key(context: Dict[str, Any], prompt_fingerprint: str) -> str:
+    """
+    Stable hash of everything that shapes the prompt. Similarity and the sentiment
+    values are bucketed so small score drift reuses the same explanation; model,
+    temperature and the prompt template are part of the key, so changing any of
+    them starts from an empty cache.
+    """
+    settings = get_settings()
+    step = settings.explanation_cache_similarity_bucket
+    video = context["video"]
+    recommendation = context["recommendation"]
+    material = {
+        "model": settings.explanation_model,
+        "temperature": settings.explanation_temperature,
+        "prompt": prompt_fingerprint,
+        "goals": sorted(context.get("goals") or []),
+        "main_objective": context.get("main_objective"),
+        "skill_levels": sorted(context.get("skill_levels") or []),
+        "learning_style": context.get("learning_style"),
+        "video": {
+            "video_id": video.get("video_id"),
+            "title": video.get("title"),
+            "topics": video.get("topics") or [],
+            "difficulty": video.get("difficulty"),
+            "sentiment_score": _bucket(video.get("sentiment_score"), step),
+        },
+        "similarity": _bucket(recommendation.get("similarity"), step),
+        "min_sentiment": _bucket(recommendation.get("min_sentiment"), step),
+        "difficulty_filter": recommendation.get("difficulty_filter"),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# Callers run on the shared HTTP loop, so these use the cache's async methods (Redis
+# round trips happen in a worker thread instead of blocking concurrent LLM calls).
+
+
+async def get_cached_explanations(keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    if not get_settings().explanation_cache_enabled or not keys:
+        return {}
+    return await get_cache("explanations").aget_many(keys)
+
+
+async def get_cached_explanation(key: str) -> Optional[Dict[str, Any]]:
+    return (await get_cached_explanations([key])).get(key)
+
+
+async def cache_explanations(entries: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Store {key: {"explanation", "usage"}} entries in one round trip.
+    """
+    settings = get_settings()
+    if settings.explanation_cache_enabled:
+        await get_cache("explanations").aset_many(entries, settings.explanation_cache_ttl_seconds)
+
+
+async def cache_explanation(key: str, explanation: str, usage: Dict[str, Any]) -> None:
+    await cache_explanations({key: {"explanation": explanation, "usage": usage}})
@@ -1,10 +1,25 @@
-from typing import Dict, Optional
+import asyncio
+import hashlib
+import json
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional
 
-import openai
+from openai import AsyncOpenAI
 
 from app.core.config import get_settings
+from app.services.explanation_cache import (
+    EMPTY_USAGE,
+    cache_explanation,
+    cache_explanations,
+    explanation_cache_key,
+    get_cached_explanation,
+    get_cached_explanations,
+)
+from app.services.http_client import get_loop_client, run_on_http_loop, run_sync
 from app.services.langfuse_monitor import get_langfuse_client
 
+logger = logging.getLogger(__name__)
+
 
 def build_context_payload(
     user_id: str,
@@ -35,42 +50,201 @@ def build_context_payload(
     }
 
 
-def generate_explanation(context: Dict[str, object]) -> Dict[str, object]:
-    settings = get_settings()
-    if not settings.openai_api_key:
-        raise RuntimeError("OPENAI_API_KEY is not configured.")
+SYSTEM_PROMPT = (
+    "You are an assistant that explains recommendation decisions."
+    " Use only the provided context (user goals, onboarding, video metadata, similarity/difficulty/sentiment) and keep the explanation concise."
+)
 
-    openai.api_key = settings.openai_api_key
-    system = (
-        "You are an assistant that explains recommendation decisions."
-        " Use only the provided context (user goals, onboarding, video metadata, similarity/difficulty/sentiment) and keep the explanation concise."
-    )
-    prompt = f"""
+USER_PROMPT_TEMPLATE = """
 User profile:
-- Goals: {context['goals']}
-- Objective: {context['main_objective']}
-- Skill levels: {context['skill_levels']}
-- Learning style: {context['learning_style']}
+- Goals: {goals}
+- Objective: {main_objective}
+- Skill levels: {skill_levels}
+- Learning style: {learning_style}
 
 Video:
-- Title: {context['video']['title']}
-- Topics: {context['video']['topics']}
-- Difficulty: {context['video']['difficulty']}
-- Sentiment score: {context['video']['sentiment_score']}
+- Title: {title}
+- Topics: {topics}
+- Difficulty: {difficulty}
+- Sentiment score: {sentiment_score}
 
 Recommendation metadata:
-- Similarity: {context['recommendation'].get('similarity')}
-- Sentiment filter: {context['recommendation'].get('min_sentiment')}
-- Difficulty filter: {context['recommendation'].get('difficulty_filter')}
+- Similarity: {similarity}
+- Sentiment filter: {min_sentiment}
+- Difficulty filter: {difficulty_filter}
 
 Explain in a short paragraph why this video makes sense, referencing the user goals, NLP signals, and similarity result.
 """
 
-    messages = [
-        {"role": "system", "content": system},
+
+PROMPT_FINGERPRINT = hashlib.sha1((SYSTEM_PROMPT + USER_PROMPT_TEMPLATE).encode("utf-8")).hexdigest()[:12]
+
+
+def build_messages(context: Dict[str, object]) -> List[Dict[str, str]]:
+    prompt = USER_PROMPT_TEMPLATE.format(
+        goals=context["goals"],
+        main_objective=context["main_objective"],
+        skill_levels=context["skill_levels"],
+        learning_style=context["learning_style"],
+        title=context["video"]["title"],
+        topics=context["video"]["topics"],
+        difficulty=context["video"]["difficulty"],
+        sentiment_score=context["video"]["sentiment_score"],
+        similarity=context["recommendation"].get("similarity"),
+        min_sentiment=context["recommendation"].get("min_sentiment"),
+        difficulty_filter=context["recommendation"].get("difficulty_filter"),
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": prompt},
     ]
 
+
+BATCH_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT
+    + " You will receive one user profile and several videos. Reply with a JSON object of the form"
+    ' {"explanations": [{"video_id": "...", "explanation": "..."}]} containing exactly one entry per video_id.'
+)
+
+# The user block comes first and is identical for every batch of the same user, so
+# provider-side prompt caching can reuse it across calls.
+BATCH_USER_PREFIX_TEMPLATE = """
+User profile:
+- Goals: {goals}
+- Objective: {main_objective}
+- Skill levels: {skill_levels}
+- Learning style: {learning_style}
+
+Recommendation filters:
+- Sentiment filter: {min_sentiment}
+- Difficulty filter: {difficulty_filter}
+"""
+
+BATCH_VIDEO_TEMPLATE = """
+Video {video_id}:
+- Title: {title}
+- Topics: {topics}
+- Difficulty: {difficulty}
+- Sentiment score: {sentiment_score}
+- Similarity: {similarity}
+"""
+
+BATCH_INSTRUCTIONS = """
+For each video, explain in a short paragraph why it makes sense for this user, referencing the user goals, NLP signals, and similarity result.
+"""
+
+BATCH_PROMPT_FINGERPRINT = hashlib.sha1(
+    (BATCH_SYSTEM_PROMPT + BATCH_USER_PREFIX_TEMPLATE + BATCH_VIDEO_TEMPLATE + BATCH_INSTRUCTIONS).encode("utf-8")
+).hexdigest()[:12]
+
+
+def _batch_group_key(context: Dict[str, object]) -> str:
+    # contexts can only share a prompt when the user block and filters are identical
+    return BATCH_USER_PREFIX_TEMPLATE.format(
+        goals=context["goals"],
+        main_objective=context["main_objective"],
+        skill_levels=context["skill_levels"],
+        learning_style=context["learning_style"],
+        min_sentiment=context["recommendation"].get("min_sentiment"),
+        difficulty_filter=context["recommendation"].get("difficulty_filter"),
+    )
+
+
+def build_batch_messages(contexts: List[Dict[str, object]]) -> List[Dict[str, str]]:
+    videos = "".join(
+        BATCH_VIDEO_TEMPLATE.format(
+            video_id=context["video"]["video_id"],
+            title=context["video"]["title"],
+            topics=context["video"]["topics"],
+            difficulty=context["video"]["difficulty"],
+            sentiment_score=context["video"]["sentiment_score"],
+            similarity=context["recommendation"].get("similarity"),
+        )
+        for context in contexts
+    )
+    return [
+        {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+        {"role": "user", "content": _batch_group_key(contexts[0]) + videos + BATCH_INSTRUCTIONS},
+    ]
+
+
+def parse_batch_explanations(content: Optional[str], video_ids: List[str]) -> Dict[str, str]:
+    """
+    Explanations by video_id from a batched completion. Entries for unknown ids,
+    duplicates and empty texts are dropped; anything unparseable yields {}.
+    """
+    try:
+        payload = json.loads(content or "")
+    except ValueError:
+        return {}
+    entries = payload.get("explanations") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        return {}
+    wanted = set(video_ids)
+    explanations: Dict[str, str] = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        video_id, explanation = entry.get("video_id"), entry.get("explanation")
+        if video_id not in wanted or video_id in explanations:
+            continue
+        if isinstance(explanation, str) and explanation.strip():
+            explanations[video_id] = explanation.strip()
+    return explanations
+
+
+def split_usage(usage: Dict[str, Optional[int]], parts: int) -> List[Dict[str, Optional[int]]]:
+    # integer shares that add back up to the call's usage, so per-result sums stay exact
+    shares = [{} for _ in range(parts)]
+    for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        total = usage.get(key)
+        for idx, share in enumerate(shares):
+            share[key] = None if total is None else total // parts + (1 if idx < total % parts else 0)
+    return shares
+
+
+def usage_dict(usage) -> Dict[str, Optional[int]]:
+    # openai>=1 returns a CompletionUsage model; keep plain dicts in responses and caches
+    if usage is None:
+        return {}
+    if hasattr(usage, "model_dump"):
+        usage = usage.model_dump()
+    return {key: usage.get(key) for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
+
+
+def _new_async_openai() -> AsyncOpenAI:
+    settings = get_settings()
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url,
+        max_retries=settings.http_max_retries,
+    )
+
+
+def _get_async_openai() -> AsyncOpenAI:
+    # only awaited on the shared HTTP loop (see http_client.run_sync); closed with it
+    return get_loop_client(_new_async_openai)
+
+
+async def agenerate_explanation(
+    context: Dict[str, object],
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    """
+    Explain one recommendation. With `on_token` the completion is streamed and each
+    content delta is passed to it as it arrives; cache hits produce no deltas.
+    """
+    settings = get_settings()
+    if not settings.openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is not configured.")
+
+    cache_key = explanation_cache_key(context, PROMPT_FINGERPRINT)
+    cached = await get_cached_explanation(cache_key)
+    if cached is not None:
+        return {"explanation": cached["explanation"], "usage": EMPTY_USAGE, "context": context, "cached": True}
+
+    messages = build_messages(context)
+
     langfuse_client = get_langfuse_client()
     generation_metadata = {
         "user_id": context["user_id"],
@@ -78,39 +252,298 @@ Explain in a short paragraph why this video makes sense, referencing the user go
         "similarity": context["recommendation"].get("similarity"),
     }
 
-    def call_model():
-        return openai.chat.completions.create(
-            model=settings.explanation_model,
-            messages=messages,
-            temperature=settings.explanation_temperature,
+    async def call_model():
+        request = {
+            "model": settings.explanation_model,
+            "messages": messages,
+            "temperature": settings.explanation_temperature,
+            "timeout": settings.explanation_timeout_seconds,
+        }
+        if on_token is None:
+            response = await _get_async_openai().chat.completions.create(**request)
+            return response.choices[0].message.content.strip(), usage_dict(response.usage)
+
+        stream = await _get_async_openai().chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
         )
+        parts, usage = [], None
+        async for chunk in stream:
+            # the final chunk carries usage and no choices
+            if chunk.usage is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+                    on_token(choice.delta.content)
+        return "".join(parts).strip(), usage_dict(usage)
 
     if langfuse_client:
+        # each fan-out task runs in its own copied context, so concurrent generations
+        # do not nest under each other in the trace
         with langfuse_client.start_as_current_observation(
             name="recommendation-explanation",
             as_type="generation",
-            metadata=generation_metadata,
+            metadata={**generation_metadata, "stream": on_token is not None},
             model=settings.explanation_model,
             input={"messages": messages},
         ) as generation:
-            response = call_model()
-            explanation = response.choices[0].message.content.strip()
-            usage = response.usage or {}
-            generation.update(
-                output=explanation,
-                usage_details={
-                    "prompt_tokens": usage.get("prompt_tokens"),
-                    "completion_tokens": usage.get("completion_tokens"),
-                    "total_tokens": usage.get("total_tokens"),
-                },
-            )
+            explanation, usage = await call_model()
+            generation.update(output=explanation, usage_details=usage)
     else:
-        response = call_model()
-        explanation = response.choices[0].message.content.strip()
-        usage = response.usage or {}
+        explanation, usage = await call_model()
 
+    await cache_explanation(cache_key, explanation, usage)
     return {
         "explanation": explanation,
         "usage": usage,
         "context": context,
+        "cached": False,
     }
+
+
+async def _explain_guarded(
+    context: Dict[str, object],
+    semaphore: asyncio.Semaphore,
+    timeout_seconds: float,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(agenerate_explanation(context, on_token), timeout_seconds)
+        except asyncio.TimeoutError:
+            error = f"timed out after {timeout_seconds:g}s"
+        except Exception as exc:  # noqa: BLE001
+            error = str(exc) or exc.__class__.__name__
+    return {"explanation": None, "usage": EMPTY_USAGE, "context": context, "cached": False, "error": error}
+
+
+async def agenerate_explanations(
+    contexts: List[Dict[str, object]],
+    concurrency: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+) -> List[Dict[str, object]]:
+    """
+    Explain many videos concurrently (at most `concurrency` calls in flight), in input
+    order. A call that fails or exceeds `timeout_seconds` yields a result with
+    `explanation=None` and `error` instead of failing the batch.
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(max(concurrency or settings.explanation_concurrency, 1))
+    timeout_seconds = timeout_seconds or settings.explanation_timeout_seconds
+    return await asyncio.gather(*(_explain_guarded(context, semaphore, timeout_seconds) for context in contexts))
+
+
+async def _agenerate_batch(contexts: List[Dict[str, object]], timeout_seconds: float) -> Dict[str, object]:
+    """
+    One completion for several videos of the same user. Returns
+    {"explanations": {video_id: text}, "usage": ...}; ids the model skipped or
+    answered invalidly are simply absent.
+    """
+    settings = get_settings()
+    messages = build_batch_messages(contexts)
+    video_ids = [context["video"]["video_id"] for context in contexts]
+
+    async def call_model():
+        response = await _get_async_openai().chat.completions.create(
+            model=settings.explanation_model,
+            messages=messages,
+            temperature=settings.explanation_temperature,
+            response_format={"type": "json_object"},
+            timeout=timeout_seconds,
+        )
+        return parse_batch_explanations(response.choices[0].message.content, video_ids), usage_dict(response.usage)
+
+    langfuse_client = get_langfuse_client()
+    if langfuse_client:
+        with langfuse_client.start_as_current_observation(
+            name="recommendation-explanation-batch",
+            as_type="generation",
+            metadata={"user_id": contexts[0]["user_id"], "video_ids": video_ids},
+            model=settings.explanation_model,
+            input={"messages": messages},
+        ) as generation:
+            explanations, usage = await call_model()
+            generation.update(
+                output=explanations,
+                usage_details=usage,
+                metadata={"missing": [video_id for video_id in video_ids if video_id not in explanations]},
+            )
+    else:
+        explanations, usage = await call_model()
+    return {"explanations": explanations, "usage": usage}
+
+
+async def agenerate_explanations_batched(
+    contexts: List[Dict[str, object]],
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+) -> List[Dict[str, object]]:
+    """
+    Like agenerate_explanations, but sends the shared user block once per call and asks
+    for up to `batch_size` explanations as JSON. Videos missing from a valid answer,
+    and every video of a failed call, fall back to per-video calls. Batched results
+    carry `batched: true` and an even share of the call's usage.
+    """
+    settings = get_settings()
+    batch_size = max(batch_size or settings.explanation_batch_size, 1)
+    semaphore = asyncio.Semaphore(max(concurrency or settings.explanation_concurrency, 1))
+    timeout_seconds = timeout_seconds or settings.explanation_batch_timeout_seconds
+
+    results: List[Optional[Dict[str, object]]] = [None] * len(contexts)
+    groups: Dict[str, List[int]] = {}
+    keys = [explanation_cache_key(context, BATCH_PROMPT_FINGERPRINT) for context in contexts]
+    cached_entries = await get_cached_explanations(keys)
+    for idx, context in enumerate(contexts):
+        cached = cached_entries.get(keys[idx])
+        if cached is not None:
+            results[idx] = {
+                "explanation": cached["explanation"],
+                "usage": EMPTY_USAGE,
+                "context": context,
+                "cached": True,
+                "batched": True,
+            }
+        else:
+            groups.setdefault(_batch_group_key(context), []).append(idx)
+
+    async def explain_batch(indexes: List[int]) -> None:
+        batch = [contexts[idx] for idx in indexes]
+        async with semaphore:
+            try:
+                answer = await asyncio.wait_for(_agenerate_batch(batch, timeout_seconds), timeout_seconds)
+            except Exception:  # noqa: BLE001
+                logger.warning("batched explanation call failed; falling back to per-video calls", exc_info=True)
+                return
+        explained = [idx for idx in indexes if contexts[idx]["video"]["video_id"] in answer["explanations"]]
+        fresh = {}
+        for idx, usage in zip(explained, split_usage(answer["usage"], max(len(explained), 1))):
+            context = contexts[idx]
+            explanation = answer["explanations"][context["video"]["video_id"]]
+            fresh[keys[idx]] = {"explanation": explanation, "usage": usage}
+            results[idx] = {
+                "explanation": explanation,
+                "usage": usage,
+                "context": context,
+                "cached": False,
+                "batched": True,
+            }
+        await cache_explanations(fresh)
+
+    # without a key every uncached video goes to the fallback, which reports it per item
+    chunks = [
+        indexes[start : start + batch_size]
+        for indexes in (groups.values() if settings.openai_api_key else [])
+        for start in range(0, len(indexes), batch_size)
+    ]
+    await asyncio.gather(*(explain_batch(chunk) for chunk in chunks))
+
+    missing = [idx for idx, result in enumerate(results) if result is None]
+    if missing:
+        fallback = await agenerate_explanations([contexts[idx] for idx in missing], concurrency)
+        for idx, result in zip(missing, fallback):
+            results[idx] = {**result, "batched": False}
+    return results
+
+
+async def astream_explanations(
+    contexts: List[Dict[str, object]],
+    stream_tokens: bool = False,
+    concurrency: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+) -> AsyncIterator[Dict[str, object]]:
+    """
+    Same fan-out as agenerate_explanations, but yields events on the caller's loop as
+    they happen: `{"type": "explanation", "index", "result"}` in completion order, and
+    with stream_tokens `{"type": "token", "index", "delta"}` before each one. The calls
+    run on the shared HTTP loop and are cancelled if the consumer stops early.
+    """
+    if not contexts:
+        return
+    settings = get_settings()
+    semaphore_size = max(concurrency or settings.explanation_concurrency, 1)
+    timeout_seconds = timeout_seconds or settings.explanation_timeout_seconds
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: Optional[Dict[str, object]]) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            # consumer's loop already closed while cancelled calls unwind
+            pass
+
+    async def produce() -> None:
+        # runs on the HTTP loop; the semaphore must be created there
+        semaphore = asyncio.Semaphore(semaphore_size)
+
+        async def explain(index: int, context: Dict[str, object]) -> None:
+            def on_token(delta: str) -> None:
+                emit({"type": "token", "index": index, "delta": delta})
+
+            result = await _explain_guarded(context, semaphore, timeout_seconds, on_token if stream_tokens else None)
+            emit({"type": "explanation", "index": index, "result": result})
+
+        try:
+            await asyncio.gather(*(explain(index, context) for index, context in enumerate(contexts)))
+        finally:
+            emit(None)
+
+    producer = asyncio.ensure_future(run_on_http_loop(produce()))
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+        await producer
+    finally:
+        producer.cancel()
+
+
+def generate_explanation(context: Dict[str, object]) -> Dict[str, object]:
+    return run_sync(agenerate_explanation(context))
+
+
+def generate_explanations(
+    contexts: List[Dict[str, object]],
+    concurrency: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+    batched: bool = False,
+) -> List[Dict[str, object]]:
+    """
+    Sync entry point for routes and tasks; runs the fan-out on the shared HTTP loop.
+    """
+    if not contexts:
+        return []
+    if batched:
+        return run_sync(
+            agenerate_explanations_batched(contexts, concurrency=concurrency, timeout_seconds=timeout_seconds)
+        )
+    return run_sync(agenerate_explanations(contexts, concurrency, timeout_seconds))
+
+
+async def run_explanation(context: Dict[str, object]) -> Dict[str, object]:
+    """
+    generate_explanation for async routes: awaits the call on the shared HTTP loop
+    without blocking the caller's loop.
+    """
+    return await run_on_http_loop(agenerate_explanation(context))
+
+
+async def run_explanations(
+    contexts: List[Dict[str, object]],
+    concurrency: Optional[int] = None,
+    timeout_seconds: Optional[float] = None,
+    batched: bool = False,
+) -> List[Dict[str, object]]:
+    """
+    generate_explanations for async routes.
+    """
+    if not contexts:
+        return []
+    if batched:
+        return await run_on_http_loop(
+            agenerate_explanations_batched(contexts, concurrency=concurrency, timeout_seconds=timeout_seconds)
+        )
+    return await run_on_http_loop(agenerate_explanations(contexts, concurrency, timeout_seconds))
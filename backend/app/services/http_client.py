@@ -0,0 +1,222 @@
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _backoff_seconds(attempt: int, response: Optional[httpx.Response]) -> float:
+    settings = get_settings()
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), settings.http_retry_max_backoff_seconds)
+    delay = settings.http_retry_backoff_seconds * (2**attempt)
+    return min(delay, settings.http_retry_max_backoff_seconds) * random.uniform(0.5, 1.0)
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    Retries 429/5xx responses and connection errors with exponential backoff.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, max_retries: int):
+        self._transport = transport
+        self._max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._max_retries + 1):
+            last_attempt = attempt == self._max_retries
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                time.sleep(_backoff_seconds(attempt, None))
+                continue
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            response.close()
+            time.sleep(_backoff_seconds(attempt, response))
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_retries: int):
+        self._transport = transport
+        self._max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._max_retries + 1):
+            last_attempt = attempt == self._max_retries
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                await asyncio.sleep(_backoff_seconds(attempt, None))
+                continue
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            await response.aclose()
+            await asyncio.sleep(_backoff_seconds(attempt, response))
+        raise AssertionError("unreachable")
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _client_options() -> dict:
+    settings = get_settings()
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        ),
+        "http2": settings.http_http2,
+    }
+
+
+def _timeout(read_seconds: Optional[float] = None) -> httpx.Timeout:
+    settings = get_settings()
+    return httpx.Timeout(read_seconds or settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds)
+
+
+def new_async_http_client(timeout_seconds: Optional[float] = None) -> httpx.AsyncClient:
+    """
+    Pooled async client with the shared limits and retry policy. The pool binds to
+    the event loop that first uses it, so callers own the client and its loop.
+    """
+    settings = get_settings()
+    transport = AsyncRetryTransport(httpx.AsyncHTTPTransport(**_client_options()), settings.http_max_retries)
+    return httpx.AsyncClient(transport=transport, timeout=_timeout(timeout_seconds))
+
+
+class _HttpClients:
+    """
+    Process-wide pooled clients. The async client lives on a dedicated event-loop
+    thread so sync callers (threadpool routes, Celery tasks) can share its pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_clients: Dict[Callable[[], Any], Any] = {}
+
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                settings = get_settings()
+                transport = RetryTransport(httpx.HTTPTransport(**_client_options()), settings.http_max_retries)
+                self._client = httpx.Client(transport=transport, timeout=_timeout())
+            return self._client
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name="http-client-loop", daemon=True)
+                self._loop_thread.start()
+            return self._loop
+
+    def async_client(self) -> httpx.AsyncClient:
+        self.loop()
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = new_async_http_client()
+            return self._async_client
+
+    def loop_client(self, factory: Callable[[], T]) -> T:
+        self.loop()
+        with self._lock:
+            if factory not in self._loop_clients:
+                self._loop_clients[factory] = factory()
+            return self._loop_clients[factory]
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+            loop_clients, self._loop_clients = list(self._loop_clients.values()), {}
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+
+        if client is not None:
+            client.close()
+        if loop is not None:
+            if async_client is not None:
+                asyncio.run_coroutine_threadsafe(async_client.aclose(), loop).result()
+            for loop_client in loop_clients:
+                aclose = getattr(loop_client, "aclose", None) or loop_client.close
+                asyncio.run_coroutine_threadsafe(aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout=5)
+            loop.close()
+
+
+_clients = _HttpClients()
+
+
+def get_http_client() -> httpx.Client:
+    return _clients.client()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Shared async client. Only await it on the HTTP loop: use `run_sync` from sync
+    code or `run_on_http_loop` from another event loop.
+    """
+    return _clients.async_client()
+
+
+def get_loop_client(factory: Callable[[], T]) -> T:
+    """
+    One client per factory, created on first use and bound to the HTTP loop like the
+    shared async client (e.g. SDK clients with their own pools). close_http_clients
+    closes it on that loop, so the next call after a restart builds a fresh one.
+    """
+    return _clients.loop_client(factory)
+
+
+def submit_to_http_loop(coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+    """
+    Start `coro` on the HTTP loop without waiting for it.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _clients.loop())
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    return submit_to_http_loop(coro).result()
+
+
+async def run_on_http_loop(coro: Awaitable[T]) -> T:
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, _clients.loop()))
+
+
+def open_http_clients() -> None:
+    """
+    Eagerly create the pooled clients (FastAPI lifespan / Celery worker startup).
+    """
+    _clients.client()
+    _clients.async_client()
+
+
+def close_http_clients() -> None:
+    _clients.close()
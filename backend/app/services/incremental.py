@@ -0,0 +1,54 @@
+import datetime as dt
+from typing import Dict, Iterable, List, Optional
+
+from supabase import Client
+
+from app.core.config import get_settings
+from app.services.enrichment import load_videos, video_text
+
+
+class IngestState:
+    """
+    Existing `videos_raw` state for a set of candidate video_ids, loaded up front so
+    ingestion can skip fresh videos and enrichment can skip unchanged text.
+    """
+
+    def __init__(self, freshness_hours: Optional[int] = None):
+        hours = freshness_hours if freshness_hours is not None else get_settings().ingest_freshness_hours
+        self.cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=hours)
+        self.existing: Dict[str, Dict] = {}
+        self.fresh_ids: List[str] = []
+
+    def load(self, client: Client, video_ids: Iterable[str]) -> None:
+        for row in load_videos(client, list(video_ids), "video_id, title, description, fetched_at, difficulty"):
+            self.existing[row["video_id"]] = row
+
+    def is_fresh(self, video_id: str) -> bool:
+        row = self.existing.get(video_id)
+        if not row or row.get("difficulty") is None or not row.get("fetched_at"):
+            return False
+        try:
+            fetched_at = dt.datetime.fromisoformat(row["fetched_at"].replace("Z", "+00:00"))
+        except ValueError:
+            return False
+        return fetched_at >= self.cutoff
+
+    def selector(self, client: Client):
+        """
+        Callback for `fetch_youtube_metadata(select_video_ids=...)`: one lookup for all
+        searched ids, then only new or stale ids get their details fetched.
+        """
+
+        def select(video_ids: List[str]) -> List[str]:
+            self.load(client, video_ids)
+            self.fresh_ids = [video_id for video_id in video_ids if self.is_fresh(video_id)]
+            fresh = set(self.fresh_ids)
+            return [video_id for video_id in video_ids if video_id not in fresh]
+
+        return select
+
+    def needs_enrichment(self, video: Dict) -> bool:
+        row = self.existing.get(video.get("video_id"))
+        if not row or row.get("difficulty") is None:
+            return True
+        return video_text(row) != video_text(video)
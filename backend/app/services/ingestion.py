@@ -0,0 +1,62 @@
+from typing import Dict, Iterator, List
+
+from supabase import Client
+
+from app.schemas.ingestion import YoutubeIngestRequest
+from app.services.incremental import IngestState
+from app.services.youtube import iter_youtube_metadata_pages
+
+
+def iter_ingest_for_enrichment(
+    client: Client,
+    payload: YoutubeIngestRequest,
+    summary: Dict[str, int],
+) -> Iterator[Dict]:
+    """
+    Fetch + upsert videos for the requested topics page by page, yielding the rows that
+    need enrichment as soon as their page is stored, so enrichment can start while the
+    fetch is still running. `summary` holds the ingested / skipped_fresh /
+    skipped_unchanged counters once the generator is exhausted.
+    """
+    ingest_state = IngestState(payload.freshness_hours) if payload.incremental and not payload.refresh else None
+    summary.update(ingested=0, skipped_fresh=0, skipped_unchanged=0)
+    pages = iter_youtube_metadata_pages(
+        topics=payload.topics,
+        max_results_per_topic=payload.max_results_per_topic,
+        min_view_count=payload.min_view_count,
+        max_age_days=payload.max_age_days,
+        exclude_keywords=payload.exclude_keywords,
+        order=payload.order,
+        select_video_ids=ingest_state.selector(client) if ingest_state else None,
+    )
+
+    # a refresh deletes once searches succeeded, right before the first page is written
+    pending_delete = payload.refresh
+    for videos in pages:
+        if pending_delete:
+            client.table("videos_raw").delete().contains("topics_source", payload.topics).execute()
+            pending_delete = False
+        client.table("videos_raw").upsert(videos, on_conflict="video_id").execute()
+        summary["ingested"] += len(videos)
+        for video in videos:
+            if not video.get("video_id"):
+                continue
+            if ingest_state and not ingest_state.needs_enrichment(video):
+                summary["skipped_unchanged"] += 1
+                continue
+            yield {"video_id": video["video_id"], "title": video.get("title"), "description": video.get("description")}
+    if pending_delete:
+        client.table("videos_raw").delete().contains("topics_source", payload.topics).execute()
+
+    summary["skipped_fresh"] = len(ingest_state.fresh_ids) if ingest_state else 0
+
+
+def ingest_for_enrichment(client: Client, payload: YoutubeIngestRequest) -> Dict[str, object]:
+    """
+    Fetch + upsert videos for the requested topics and decide which rows need enrichment.
+    Used by the Celery ingest task, which chunks the full list; the onboarding-refresh
+    route streams iter_ingest_for_enrichment into its pipeline instead.
+    """
+    summary: Dict[str, int] = {}
+    to_enrich: List[Dict] = list(iter_ingest_for_enrichment(client, payload, summary))
+    return {**summary, "to_enrich": to_enrich}
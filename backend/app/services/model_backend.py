@@ -0,0 +1,97 @@
+import os
+from typing import Optional
+
+from sentence_transformers import SentenceTransformer
+from transformers import AutoTokenizer, pipeline
+
+from app.core.config import get_settings
+
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment"
+
+ORT_FILE = "model.onnx"
+ORT_QUANTIZED_FILE = "model_quantized.onnx"
+
+
+def onnx_model_path(model_name: str) -> str:
+    settings = get_settings()
+    return os.path.join(settings.onnx_model_dir, model_name.replace("/", "__"))
+
+
+def _embedder_onnx_file() -> str:
+    settings = get_settings()
+    if settings.onnx_quantize:
+        return f"onnx/model_qint8_{settings.onnx_quantization_config}.onnx"
+    return "onnx/model.onnx"
+
+
+def _require_onnx_export(path: str) -> None:
+    if not os.path.isdir(path):
+        raise RuntimeError(
+            f"ONNX model not found at {path}. Run `python -m scripts.onnx_models export` first."
+        )
+
+
+def load_embedder(backend: Optional[str] = None) -> SentenceTransformer:
+    settings = get_settings()
+    backend = backend or settings.inference_backend
+    if backend == "onnx":
+        path = onnx_model_path(settings.embedding_model)
+        _require_onnx_export(path)
+        return SentenceTransformer(path, backend="onnx", model_kwargs={"file_name": _embedder_onnx_file()})
+    return SentenceTransformer(settings.embedding_model)
+
+
+def _load_classification_pipeline(task: str, model_name: str, backend: Optional[str]):
+    settings = get_settings()
+    backend = backend or settings.inference_backend
+    if backend != "onnx":
+        return pipeline(task, model=model_name)
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    path = onnx_model_path(model_name)
+    _require_onnx_export(path)
+    model = ORTModelForSequenceClassification.from_pretrained(
+        path,
+        file_name=ORT_QUANTIZED_FILE if settings.onnx_quantize else ORT_FILE,
+    )
+    return pipeline(task, model=model, tokenizer=AutoTokenizer.from_pretrained(path))
+
+
+def load_zero_shot_classifier(backend: Optional[str] = None):
+    return _load_classification_pipeline("zero-shot-classification", ZERO_SHOT_MODEL, backend)
+
+
+def load_sentiment_analyzer(backend: Optional[str] = None):
+    return _load_classification_pipeline("sentiment-analysis", SENTIMENT_MODEL, backend)
+
+
+def export_onnx_models(quantize: bool = True) -> None:
+    """
+    Export MiniLM, bart-large-mnli and twitter-roberta-sentiment to ONNX under
+    settings.onnx_model_dir, plus dynamically quantized int8 variants when requested.
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    settings = get_settings()
+
+    embed_path = onnx_model_path(settings.embedding_model)
+    embedder = SentenceTransformer(settings.embedding_model, backend="onnx")
+    embedder.save_pretrained(embed_path)
+    if quantize:
+        export_dynamic_quantized_onnx_model(embedder, settings.onnx_quantization_config, embed_path)
+
+    for model_name in (ZERO_SHOT_MODEL, SENTIMENT_MODEL):
+        path = onnx_model_path(model_name)
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(path)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(path)
+        if quantize:
+            quantizer = ORTQuantizer.from_pretrained(path, file_name=ORT_FILE)
+            qconfig = getattr(AutoQuantizationConfig, settings.onnx_quantization_config)(
+                is_static=False, per_channel=False
+            )
+            quantizer.quantize(save_dir=path, quantization_config=qconfig)
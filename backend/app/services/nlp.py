@@ -1,9 +1,10 @@
 from functools import lru_cache
 from typing import Dict, List, Optional
 
-from transformers import pipeline
+import torch
 
 from app.core.config import get_settings
+from app.services.model_backend import load_sentiment_analyzer, load_zero_shot_classifier
 
 DIFFICULTY_LABELS = ["Beginner", "Intermediate", "Advanced"]
 TOPIC_CANDIDATES = [
@@ -19,51 +20,126 @@ TOPIC_CANDIDATES = [
     "SQL",
     "Design Systems",
 ]
+DIFFICULTY_HYPOTHESIS = "This text is {} level."
+TOPIC_HYPOTHESIS = "This text is about {}."
 
 
 @lru_cache(maxsize=1)
 def _get_zero_shot_classifier():
-    return pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+    return load_zero_shot_classifier()
 
 
 @lru_cache(maxsize=1)
 def _get_sentiment_analyzer():
-    return pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
+    return load_sentiment_analyzer()
 
 
-def classify_difficulty(text: str) -> Dict[str, float]:
+def _nli_logits(texts: List[str], hypotheses: List[str]) -> torch.Tensor:
+    """
+    Score every (text, hypothesis) pair in one forward pass; returns [len(texts), len(hypotheses), n_classes].
+    """
     classifier = _get_zero_shot_classifier()
-    candidate_labels = DIFFICULTY_LABELS
-    if not text:
-        return {"label": "Intermediate", "score": 0.5}
-
-    result = classifier(
-        text,
-        candidate_labels,
-        hypothesis_template="This text is {} level.",
-    )
-    label = result["labels"][0]
-    score = result["scores"][0]
-    return {"label": label, "score": float(score)}
+    tokenizer = classifier.tokenizer
+    model = classifier.model
+    premises = [text for text in texts for _ in hypotheses]
+    inputs = tokenizer(
+        premises,
+        hypotheses * len(texts),
+        return_tensors="pt",
+        padding=True,
+        truncation="only_first",
+    ).to(model.device)
+    with torch.no_grad():
+        logits = model(**inputs).logits
+    return logits.reshape(len(texts), len(hypotheses), -1)
 
 
-def extract_topics(text: str, max_tags: int = 3, threshold: float = 0.25) -> List[str]:
-    if not text:
-        return []
+def _length_sorted(items: List[str]) -> List[int]:
+    # Neighbouring inputs of similar length pad to similar sizes within a batch.
+    return sorted(range(len(items)), key=lambda idx: len(items[idx]))
+
+
+def enrich_texts(
+    texts: List[str],
+    max_tags: int = 3,
+    threshold: float = 0.25,
+    batch_size: Optional[int] = None,
+    mode: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """
+    Difficulty + topic tags for many texts. `mode` (default: settings.enrichment_mode)
+    picks the fused BART-MNLI path ("zero_shot") or MiniLM prototype similarity ("fast").
+    """
+    if (mode or get_settings().enrichment_mode) == "fast":
+        # imported lazily: the prototype classifier depends on this module's label sets
+        from app.services.prototype_classifier import classify_texts
+
+        return classify_texts(texts, max_tags=max_tags)
+    return _enrich_texts_zero_shot(texts, max_tags=max_tags, threshold=threshold, batch_size=batch_size)
+
+
+def _enrich_texts_zero_shot(
+    texts: List[str],
+    max_tags: int,
+    threshold: float,
+    batch_size: Optional[int],
+) -> List[Dict[str, object]]:
+    """
+    Fused zero-shot enrichment: difficulty (single-label) and topics (multi-label)
+    hypotheses are scored together, matching the pipeline's per-call scoring.
+    Texts are length-sorted and scored `batch_size` at a time.
+    """
+    results: List[Dict[str, object]] = [
+        {"difficulty": {"label": "Intermediate", "score": 0.5}, "topics": []} for _ in texts
+    ]
+    order = [idx for idx in _length_sorted(texts) if texts[idx]]
+    if not order:
+        return results
+
     classifier = _get_zero_shot_classifier()
-    result = classifier(
-        text,
-        TOPIC_CANDIDATES,
-        hypothesis_template="This text is about {}.",
-        multi_label=True,
-    )
-    topics = []
-    for label, score in zip(result["labels"], result["scores"]):
-        if len(topics) >= max_tags:
-            break
-        if score >= threshold:
-            topics.append(label)
-    return topics
+    entailment_id = classifier.entailment_id
+    contradiction_id = -1 if entailment_id == 0 else 0
+    batch_size = batch_size or get_settings().nlp_batch_size
+
+    hypotheses = [DIFFICULTY_HYPOTHESIS.format(label) for label in DIFFICULTY_LABELS]
+    hypotheses += [TOPIC_HYPOTHESIS.format(topic) for topic in TOPIC_CANDIDATES]
+    n_difficulty = len(DIFFICULTY_LABELS)
+
+    for start in range(0, len(order), batch_size):
+        chunk = order[start : start + batch_size]
+        logits = _nli_logits([texts[idx] for idx in chunk], hypotheses)
+        difficulty_scores = logits[:, :n_difficulty, entailment_id].softmax(dim=-1)
+        topic_scores = logits[:, n_difficulty:][..., [contradiction_id, entailment_id]].softmax(dim=-1)[..., 1]
+
+        for row, idx in enumerate(chunk):
+            best = int(difficulty_scores[row].argmax())
+            ranked = sorted(
+                zip(TOPIC_CANDIDATES, topic_scores[row].tolist()),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+            results[idx] = {
+                "difficulty": {"label": DIFFICULTY_LABELS[best], "score": float(difficulty_scores[row, best])},
+                "topics": [label for label, score in ranked if score >= threshold][:max_tags],
+            }
+    return results
+
+
+def enrich_text(
+    text: str,
+    max_tags: int = 3,
+    threshold: float = 0.25,
+    mode: Optional[str] = None,
+) -> Dict[str, object]:
+    return enrich_texts([text], max_tags=max_tags, threshold=threshold, mode=mode)[0]
+
+
+def classify_difficulty(text: str) -> Dict[str, float]:
+    return enrich_text(text)["difficulty"]
+
+
+def extract_topics(text: str, max_tags: int = 3, threshold: float = 0.25) -> List[str]:
+    return enrich_text(text, max_tags=max_tags, threshold=threshold)["topics"]
 
 
 def analyze_comments_sentiment(comments: List[str]) -> Dict[str, Optional[float]]:
@@ -79,3 +155,37 @@ def analyze_comments_sentiment(comments: List[str]) -> Dict[str, Optional[float]
     )
     ratio = positive / len(preds) if preds else 0.0
     return {"score": float(ratio), "count": len(preds)}
+
+
+def analyze_comments_sentiment_batch(
+    comment_lists: List[List[str]],
+    batch_size: Optional[int] = None,
+) -> List[Dict[str, Optional[float]]]:
+    """
+    Sentiment for many videos' comments in one length-sorted, batched pipeline call.
+    """
+    flat = [(owner, comment) for owner, comments in enumerate(comment_lists) for comment in comments]
+    if not flat:
+        return [{"score": None, "count": 0} for _ in comment_lists]
+
+    analyzer = _get_sentiment_analyzer()
+    comments = [comment for _, comment in flat]
+    order = _length_sorted(comments)
+    preds = analyzer(
+        [comments[idx] for idx in order],
+        truncation=True,
+        batch_size=batch_size or get_settings().nlp_batch_size,
+    )
+
+    positives = [0] * len(comment_lists)
+    counts = [0] * len(comment_lists)
+    for idx, pred in zip(order, preds):
+        owner = flat[idx][0]
+        counts[owner] += 1
+        if pred.get("label", "").lower().startswith("positive"):
+            positives[owner] += 1
+
+    return [
+        {"score": float(positives[i] / counts[i]), "count": counts[i]} if counts[i] else {"score": None, "count": 0}
+        for i in range(len(comment_lists))
+    ]
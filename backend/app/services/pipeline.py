@@ -0,0 +1,160 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step. `fn` receives a batch (list) of items and returns the items to
+    pass downstream. I/O stages use batch_size=1 with several workers; model stages
+    use one worker with larger batches.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[List[Any]], List[Any]],
+        concurrency: int = 1,
+        batch_size: int = 1,
+        batch_wait_seconds: float = 0.02,
+    ):
+        self.name = name
+        self.fn = fn
+        self.concurrency = max(concurrency, 1)
+        self.batch_size = max(batch_size, 1)
+        self.batch_wait_seconds = batch_wait_seconds
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        self._stats = {"items_in": 0, "items_out": 0, "batches": 0, "errors": 0, "busy_seconds": 0.0}
+        self.error_samples: List[str] = []
+
+    def _record(self, items_in: int, items_out: int, busy: float, error: Optional[Exception]) -> None:
+        with self._lock:
+            self._stats["items_in"] += items_in
+            self._stats["items_out"] += items_out
+            self._stats["batches"] += 1
+            self._stats["busy_seconds"] += busy
+            if error is not None:
+                self._stats["errors"] += items_in
+                if len(self.error_samples) < 5:
+                    self.error_samples.append(repr(error))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            wall = (self._finished or time.perf_counter()) - self._started if self._started else 0.0
+        stats.update(
+            {
+                "concurrency": self.concurrency,
+                "batch_size": self.batch_size,
+                "avg_batch_size": stats["items_in"] / stats["batches"] if stats["batches"] else 0.0,
+                "wall_seconds": wall,
+                "throughput_per_second": stats["items_out"] / wall if wall else 0.0,
+            }
+        )
+        if self.error_samples:
+            stats["error_samples"] = list(self.error_samples)
+        return stats
+
+
+class StagedPipeline:
+    """
+    Stages connected by bounded queues, each with its own worker threads, so items
+    stream through and total time tracks the slowest stage rather than the sum.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 64):
+        self.stages = stages
+        self.queue_size = max(queue_size, 1)
+
+    def _collect(self, inbox: "queue.Queue", stage: Stage) -> tuple[List[Any], bool]:
+        first = inbox.get()
+        if first is _DONE:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + stage.batch_wait_seconds
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = inbox.get(timeout=remaining) if remaining > 0 else inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _worker(self, stage: Stage, inbox: "queue.Queue", outbox: "queue.Queue", remaining: List[int]) -> None:
+        while True:
+            batch, done = self._collect(inbox, stage)
+            if batch:
+                started = time.perf_counter()
+                with stage._lock:
+                    stage._started = stage._started or started
+                error = None
+                outputs: List[Any] = []
+                try:
+                    outputs = stage.fn(batch) or []
+                except Exception as exc:  # noqa: BLE001
+                    error = exc
+                stage._record(len(batch), len(outputs), time.perf_counter() - started, error)
+                for output in outputs:
+                    outbox.put(output)
+            if done:
+                # wake sibling workers, and let the last one close the stage downstream
+                inbox.put(_DONE)
+                with stage._lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                    if last:
+                        stage._finished = time.perf_counter()
+                if last:
+                    outbox.put(_DONE)
+                return
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: "queue.Queue" = queue.Queue()
+        outboxes = queues[1:] + [results]
+
+        threads = []
+        for stage, inbox, outbox in zip(self.stages, queues, outboxes):
+            remaining = [stage.concurrency]
+            for idx in range(stage.concurrency):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, inbox, outbox, remaining),
+                    name=f"pipeline-{stage.name}-{idx}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        # `items` may be a generator still producing (e.g. pages from a fetch); if it
+        # fails, the stages drain what they already have before the error propagates
+        feed_error: Optional[BaseException] = None
+        try:
+            for item in items:
+                queues[0].put(item)
+        except BaseException as exc:  # noqa: BLE001
+            feed_error = exc
+        queues[0].put(_DONE)
+
+        collected = []
+        while True:
+            item = results.get()
+            if item is _DONE:
+                break
+            collected.append(item)
+        for thread in threads:
+            thread.join()
+        if feed_error is not None:
+            raise feed_error
+        return collected
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.stats() for stage in self.stages}
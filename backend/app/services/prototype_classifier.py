@@ -0,0 +1,100 @@
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.embeddings import embed_texts
+from app.services.nlp import DIFFICULTY_LABELS, TOPIC_CANDIDATES, TOPIC_HYPOTHESIS
+
+# Several phrasings per difficulty label; their mean embedding is the label prototype.
+DIFFICULTY_PROTOTYPE_PHRASES: Dict[str, List[str]] = {
+    "Beginner": [
+        "This text is Beginner level.",
+        "An introduction for absolute beginners, no prior experience needed.",
+        "Getting started crash course covering the basics step by step.",
+    ],
+    "Intermediate": [
+        "This text is Intermediate level.",
+        "Builds on the fundamentals with practical projects and common patterns.",
+        "For developers who know the basics and want to go further.",
+    ],
+    "Advanced": [
+        "This text is Advanced level.",
+        "Deep dive into internals, performance tuning and production architecture.",
+        "Expert techniques and edge cases for experienced engineers.",
+    ],
+}
+
+
+def _prototype_matrix(phrase_groups: List[List[str]]) -> np.ndarray:
+    flat = [phrase for group in phrase_groups for phrase in group]
+    vectors = np.asarray(embed_texts(flat), dtype=np.float32)
+    prototypes = []
+    offset = 0
+    for group in phrase_groups:
+        mean = vectors[offset : offset + len(group)].mean(axis=0)
+        prototypes.append(mean / (np.linalg.norm(mean) or 1.0))
+        offset += len(group)
+    return np.stack(prototypes)
+
+
+@lru_cache(maxsize=1)
+def _difficulty_prototypes() -> np.ndarray:
+    return _prototype_matrix([DIFFICULTY_PROTOTYPE_PHRASES[label] for label in DIFFICULTY_LABELS])
+
+
+@lru_cache(maxsize=1)
+def _topic_prototypes() -> np.ndarray:
+    return _prototype_matrix([[topic, TOPIC_HYPOTHESIS.format(topic)] for topic in TOPIC_CANDIDATES])
+
+
+def classify_embeddings(
+    embeddings: np.ndarray,
+    max_tags: int = 3,
+    threshold: Optional[float] = None,
+) -> List[Dict[str, object]]:
+    """
+    Vectorized difficulty/topic tagging for a [n, dim] matrix of normalized embeddings.
+    Difficulty confidence is a temperature softmax over prototype similarities; topics
+    are prototypes whose cosine similarity clears the threshold.
+    """
+    settings = get_settings()
+    threshold = settings.fast_topic_threshold if threshold is None else threshold
+    if len(embeddings) == 0:
+        return []
+
+    difficulty_sims = embeddings @ _difficulty_prototypes().T
+    logits = difficulty_sims / settings.fast_difficulty_temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+    best = probs.argmax(axis=1)
+
+    topic_sims = embeddings @ _topic_prototypes().T
+    ranked = np.argsort(-topic_sims, axis=1)[:, :max_tags]
+
+    results = []
+    for row in range(len(embeddings)):
+        topics = [TOPIC_CANDIDATES[col] for col in ranked[row] if topic_sims[row, col] >= threshold]
+        results.append(
+            {
+                "difficulty": {"label": DIFFICULTY_LABELS[best[row]], "score": float(probs[row, best[row]])},
+                "topics": topics,
+            }
+        )
+    return results
+
+
+def classify_texts(texts: List[str], max_tags: int = 3, threshold: Optional[float] = None) -> List[Dict[str, object]]:
+    results: List[Dict[str, object]] = [
+        {"difficulty": {"label": "Intermediate", "score": 0.5}, "topics": []} for _ in texts
+    ]
+    present = [idx for idx, text in enumerate(texts) if text]
+    if not present:
+        return results
+
+    vectors = np.asarray(embed_texts([texts[idx] for idx in present]), dtype=np.float32)
+    for idx, result in zip(present, classify_embeddings(vectors, max_tags=max_tags, threshold=threshold)):
+        results[idx] = result
+    return results
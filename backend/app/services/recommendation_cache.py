@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+from app.services.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Versions only need to outlive the entries they guard; a lost version just means misses.
+VERSION_TTL_SECONDS = 7 * 86_400
+CATALOG_VERSION_KEY = "catalog"
+
+# The cache is an optimization: a disabled cache does no work, and an unreachable
+# backend (e.g. Redis down) degrades to misses and skipped bumps, never to failed requests.
+
+
+def _versions(*keys: str) -> List[str]:
+    versions = get_cache("recommendation_versions")
+    found = versions.get_many(keys)
+    # a missing version (first use, expiry, eviction) must never match older entries
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        versions.set_many(missing, VERSION_TTL_SECONDS)
+    return [found.get(key) or missing[key] for key in keys]
+
+
+def _bump(key: str) -> None:
+    if not get_settings().recommendation_cache_enabled:
+        return
+    try:
+        get_cache("recommendation_versions").set(key, uuid.uuid4().hex, VERSION_TTL_SECONDS)
+    except Exception:  # noqa: BLE001
+        logger.warning("recommendation cache version bump failed for %s", key, exc_info=True)
+
+
+def bump_user_version(user_id: str) -> None:
+    """
+    Invalidate every cached recommendation for a user (new embedding or feedback).
+    """
+    _bump(f"user:{user_id}")
+
+
+def bump_catalog_version() -> None:
+    """
+    Invalidate every cached recommendation after video embeddings change.
+    """
+    _bump(CATALOG_VERSION_KEY)
+
+
+def recommendation_key(user_id: str, params: Dict[str, Any]) -> Optional[str]:
+    """
+    Cache key for one user and query, or None when the cache is disabled or unreachable.
+    """
+    if not get_settings().recommendation_cache_enabled:
+        return None
+    normalized = {
+        name: round(value, 4) if isinstance(value, float) else value.strip() if isinstance(value, str) else value
+        for name, value in params.items()
+    }
+    digest = hashlib.sha1(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+    try:
+        user_version, catalog_version = _versions(f"user:{user_id}", CATALOG_VERSION_KEY)
+    except Exception:  # noqa: BLE001
+        logger.warning("recommendation cache versions unavailable; skipping the cache", exc_info=True)
+        return None
+    return f"{user_id}:{user_version}:{catalog_version}:{digest}"
+
+
+def get_cached_recommendations(key: Optional[str]) -> Optional[Dict[str, Any]]:
+    if key is None or not get_settings().recommendation_cache_enabled:
+        return None
+    try:
+        return get_cache("recommendations").get(key)
+    except Exception:  # noqa: BLE001
+        logger.warning("recommendation cache read failed", exc_info=True)
+        return None
+
+
+def cache_recommendations(key: Optional[str], response: Dict[str, Any]) -> None:
+    settings = get_settings()
+    if key is None or not settings.recommendation_cache_enabled:
+        return
+    try:
+        get_cache("recommendations").set(key, response, settings.recommendation_cache_ttl_seconds)
+    except Exception:  # noqa: BLE001
+        logger.warning("recommendation cache write failed", exc_info=True)
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from fastapi import Depends
+from supabase import AsyncClient
+
+from app.api.v1.feedback_utils import apply_feedback_counts
+from app.services.enrichment import ID_QUERY_CHUNK
+from app.services.supabase_client import get_async_supabase_client
+
+
+class SupabaseRepository:
+    """
+    Async reads for one request over the shared AsyncClient. Identical reads share a
+    single query: the first caller starts it and later callers await the same task, so
+    helpers can each ask for a row without coordinating. Independent reads are meant
+    to be awaited together with asyncio.gather.
+    """
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self._reads: Dict[Hashable, asyncio.Future] = {}
+
+    def _once(self, key: Hashable, read: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        task = self._reads.get(key)
+        if task is None:
+            task = asyncio.ensure_future(read())
+            self._reads[key] = task
+        return task
+
+    def row(self, table: str, column: str, value: str, columns: str = "*") -> Awaitable[Dict[str, Any]]:
+        """
+        One row by key, or {} when it does not exist.
+        """
+
+        async def read() -> Dict[str, Any]:
+            resp = await self.client.table(table).select(columns).eq(column, value).maybe_single().execute()
+            return (resp.data if resp else None) or {}
+
+        return self._once(("row", table, column, value, columns), read)
+
+    def user_row(self, table: str, user_id: str) -> Awaitable[Dict[str, Any]]:
+        return self.row(table, "user_id", user_id)
+
+    def video(self, video_id: str) -> Awaitable[Dict[str, Any]]:
+        return self.row("videos_raw", "video_id", video_id)
+
+    def videos(self, video_ids: List[str], columns: str = "*") -> Awaitable[List[Dict[str, Any]]]:
+        """
+        Rows for many video ids; the ID_QUERY_CHUNK-sized `in` queries run concurrently.
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+
+        async def read() -> List[Dict[str, Any]]:
+            chunks = [video_ids[start : start + ID_QUERY_CHUNK] for start in range(0, len(video_ids), ID_QUERY_CHUNK)]
+            responses = await asyncio.gather(
+                *(self.client.table("videos_raw").select(columns).in_("video_id", chunk).execute() for chunk in chunks)
+            )
+            return [row for resp in responses for row in (resp.data or [])]
+
+        return self._once(("videos", tuple(video_ids), columns), read)
+
+    async def adjust_preferences_with_feedback(
+        self,
+        user_id: str,
+        difficulty_filter: Optional[str],
+        min_sentiment: float,
+    ) -> tuple[Optional[str], float]:
+        # same rules and failure behaviour as feedback_utils.adjust_preferences_with_feedback
+        try:
+            counts = await self.row(
+                "user_feedback_counts", "user_id", user_id, "helpful, not_helpful, too_easy, too_hard"
+            )
+        except Exception:
+            return difficulty_filter, min_sentiment
+        return apply_feedback_counts(counts, difficulty_filter, min_sentiment)
+
+    async def upsert(self, table: str, rows: Any, on_conflict: str) -> None:
+        await self.client.table(table).upsert(rows, on_conflict=on_conflict).execute()
+
+
+async def get_repository(client: AsyncClient = Depends(get_async_supabase_client)) -> SupabaseRepository:
+    """
+    FastAPI dependency: a fresh repository (and read dedupe scope) per request.
+    """
+    return SupabaseRepository(client)
@@ -1,7 +1,11 @@
+import asyncio
 from functools import lru_cache
-from supabase import Client, create_client
+from typing import Any, Dict, Iterable, List, Optional
+
+from supabase import AsyncClient, AsyncClientOptions, Client, acreate_client, create_client
 
 from app.core.config import get_settings
+from app.services.http_client import new_async_http_client
 
 
 @lru_cache(maxsize=1)
@@ -11,3 +15,66 @@ def get_supabase_client() -> Client:
     """
     settings = get_settings()
     return create_client(settings.supabase_url, settings.supabase_service_role_key)
+
+
+class _AsyncSupabase:
+    """
+    Process-wide AsyncClient for async routes. It owns a pooled httpx client that is
+    bound to the server's event loop, so it is created and closed from the lifespan.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._client: Optional[AsyncClient] = None
+
+    async def client(self) -> AsyncClient:
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    settings = get_settings()
+                    self._client = await acreate_client(
+                        settings.supabase_url,
+                        settings.supabase_service_role_key,
+                        options=AsyncClientOptions(
+                            httpx_client=new_async_http_client(settings.supabase_timeout_seconds)
+                        ),
+                    )
+        return self._client
+
+    async def close(self) -> None:
+        async with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.options.httpx_client.aclose()
+
+
+_async_supabase = _AsyncSupabase()
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    return await _async_supabase.client()
+
+
+async def close_async_supabase_client() -> None:
+    await _async_supabase.close()
+
+
+def iter_table_pages(
+    client: Client,
+    table: str,
+    columns: str,
+    order_by: str,
+    page_size: int,
+) -> Iterable[List[Dict[str, Any]]]:
+    """
+    Read a whole table in `page_size` pages ordered by `order_by` (PostgREST caps rows per response).
+    """
+    start = 0
+    while True:
+        resp = client.table(table).select(columns).order(order_by).range(start, start + page_size - 1).execute()
+        rows = resp.data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        start += page_size
@@ -0,0 +1,369 @@
+import json
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from supabase import Client
+
+from app.core.config import get_settings
+from app.services.supabase_client import iter_table_pages
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 384
+
+
+def parse_vector(value: Any) -> Optional[np.ndarray]:
+    # PostgREST returns pgvector columns as "[0.1,0.2,...]" strings
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    vector = np.asarray(value, dtype=np.float32)
+    return vector if vector.size else None
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _metadata(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "difficulty": row.get("difficulty"),
+        "sentiment_score": row.get("sentiment_score"),
+        "topic_tags": row.get("topic_tags", row.get("topics")) or [],
+    }
+
+
+class NumpyVectorIndex:
+    """
+    Exact cosine search over a contiguous float32 matrix of unit vectors.
+    Rows are appended in place (capacity doubles) and deletes swap in the last row.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, dim: int = EMBEDDING_DIM, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((max(capacity, 1), dim), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._meta: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+
+    def upsert(self, video_ids: Sequence[str], vectors: np.ndarray, metadata: Sequence[Dict[str, Any]]) -> None:
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(video_ids), self.dim))
+        with self._lock:
+            self._grow(len(self._ids) + len(video_ids))
+            for video_id, vector, meta in zip(video_ids, vectors, metadata):
+                row = self._rows.get(video_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[video_id] = row
+                    self._ids.append(video_id)
+                    self._meta.append(meta)
+                else:
+                    self._meta[row] = meta
+                self._matrix[row] = vector
+
+    def delete(self, video_ids: Iterable[str]) -> None:
+        with self._lock:
+            for video_id in video_ids:
+                row = self._rows.pop(video_id, None)
+                if row is None:
+                    continue
+                last = len(self._ids) - 1
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self._ids[row] = self._ids[last]
+                    self._meta[row] = self._meta[last]
+                    self._rows[self._ids[row]] = row
+                self._ids.pop()
+                self._meta.pop()
+
+    def search(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        query = normalize_rows(np.asarray(query, dtype=np.float32).reshape(self.dim))
+        with self._lock:
+            size = len(self._ids)
+            if not size or k <= 0:
+                return []
+            scores = self._matrix[:size] @ query
+            k = min(k, size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {"video_id": self._ids[row], "similarity": float(scores[row]), **self._meta[row]} for row in top
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": self.backend, "size": len(self._ids), "capacity": int(self._matrix.shape[0])}
+
+
+class HnswVectorIndex:
+    """
+    Approximate cosine search with an hnswlib graph for catalogs where a full
+    matrix product per query is too slow. Requires the optional `hnswlib` package.
+    """
+
+    backend = "hnsw"
+
+    def __init__(
+        self,
+        dim: int = EMBEDDING_DIM,
+        capacity: int = 1024,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ):
+        try:
+            import hnswlib
+        except ImportError as exc:
+            raise RuntimeError("VECTOR_INDEX_BACKEND=hnsw requires `pip install hnswlib`") from exc
+
+        self.dim = dim
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="cosine", dim=dim)
+        self._index.init_index(max_elements=max(capacity, 1), ef_construction=ef_construction, M=m)
+        self._index.set_ef(ef_search)
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._meta: Dict[int, Dict[str, Any]] = {}
+        self._next_label = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def upsert(self, video_ids: Sequence[str], vectors: np.ndarray, metadata: Sequence[Dict[str, Any]]) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(video_ids), self.dim)
+        with self._lock:
+            labels = []
+            for video_id, meta in zip(video_ids, metadata):
+                label = self._labels.get(video_id)
+                if label is None:
+                    label = self._next_label
+                    self._next_label += 1
+                    self._labels[video_id] = label
+                    self._ids[label] = video_id
+                self._meta[label] = meta
+                labels.append(label)
+            needed = self._index.get_current_count() + len(labels)
+            if needed > self._index.get_max_elements():
+                self._index.resize_index(max(needed, self._index.get_max_elements() * 2))
+            # hnswlib replaces the vector when a label is added again
+            self._index.add_items(vectors, np.asarray(labels, dtype=np.int64))
+
+    def delete(self, video_ids: Iterable[str]) -> None:
+        with self._lock:
+            for video_id in video_ids:
+                label = self._labels.pop(video_id, None)
+                if label is None:
+                    continue
+                self._index.mark_deleted(label)
+                self._ids.pop(label, None)
+                self._meta.pop(label, None)
+
+    def search(self, query: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            size = len(self._labels)
+            if not size or k <= 0:
+                return []
+            k = min(k, size)
+            self._index.set_ef(max(self.ef_search, k))
+            labels, distances = self._index.knn_query(np.asarray(query, dtype=np.float32).reshape(1, self.dim), k=k)
+            return [
+                {"video_id": self._ids[int(label)], "similarity": float(1.0 - distance), **self._meta[int(label)]}
+                for label, distance in zip(labels[0], distances[0])
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "size": len(self._labels),
+                "capacity": self._index.get_max_elements(),
+                "ef_search": self.ef_search,
+            }
+
+
+def build_index(backend: str, capacity: int = 1024):
+    settings = get_settings()
+    if backend == "hnsw":
+        return HnswVectorIndex(
+            capacity=capacity,
+            m=settings.vector_index_hnsw_m,
+            ef_construction=settings.vector_index_hnsw_ef_construction,
+            ef_search=settings.vector_index_hnsw_ef_search,
+        )
+    if backend == "numpy":
+        return NumpyVectorIndex(capacity=capacity)
+    raise ValueError(f"Unknown vector index backend: {backend}")
+
+
+def load_embedding_rows(client: Client, page_size: int) -> Iterable[List[Dict[str, Any]]]:
+    """
+    video_embeddings pages with difficulty, sentiment_score and topic_tags joined from
+    videos_raw, the columns the RPC search filters on; the copies stored on
+    video_embeddings lag behind re-enrichment. Like the RPC's inner join, embeddings
+    without a videos_raw row are left out.
+    """
+    metadata: Dict[str, Dict[str, Any]] = {}
+    for rows in iter_table_pages(
+        client, "videos_raw", "video_id, difficulty, sentiment_score, topic_tags", "video_id", page_size
+    ):
+        for row in rows:
+            metadata[row["video_id"]] = _metadata(row)
+    for rows in iter_table_pages(client, "video_embeddings", "video_id, embedding", "video_id", page_size):
+        yield [{**row, **metadata[row["video_id"]]} for row in rows if row["video_id"] in metadata]
+
+
+def split_embedding_rows(rows: Iterable[Dict[str, Any]]):
+    video_ids, vectors, metadata = [], [], []
+    for row in rows:
+        vector = parse_vector(row.get("embedding"))
+        if vector is None or vector.shape[0] != EMBEDDING_DIM:
+            continue
+        video_ids.append(row["video_id"])
+        vectors.append(vector)
+        metadata.append(_metadata(row))
+    return video_ids, np.asarray(vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIM), metadata
+
+
+class VectorIndexManager:
+    """
+    Owns the process-wide index: the first search loads every `video_embeddings` row,
+    writes from this process are applied incrementally, and a stale index is rebuilt
+    from the database in a background thread (picking up writes from other processes)
+    while searches keep using the old one.
+    """
+
+    def __init__(self, backend: str, refresh_seconds: float, page_size: int):
+        self.backend = backend
+        self.refresh_seconds = refresh_seconds
+        self.page_size = page_size
+        self._index = None
+        self._loaded_at: Optional[float] = None
+        self._load_seconds = 0.0
+        self._refreshing = False
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _build(self, client: Client):
+        started = time.perf_counter()
+        index = build_index(self.backend)
+        for rows in load_embedding_rows(client, self.page_size):
+            video_ids, vectors, metadata = split_embedding_rows(rows)
+            if video_ids:
+                index.upsert(video_ids, vectors, metadata)
+        return index, time.perf_counter() - started
+
+    def _swap(self, index, load_seconds: float) -> None:
+        with self._lock:
+            # replay writes that landed while the snapshot was being read
+            pending, self._pending = self._pending, []
+            self._index = index
+            self._loaded_at = time.monotonic()
+            self._load_seconds = load_seconds
+            self._refreshing = False
+        if pending:
+            self.upsert_rows(pending)
+
+    def _refresh_in_background(self, client: Client) -> None:
+        try:
+            self._swap(*self._build(client))
+        except Exception:  # noqa: BLE001
+            logger.exception("vector index refresh failed")
+            with self._lock:
+                self._refreshing = False
+                self._pending = []
+                self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, client: Client):
+        if self._index is None:
+            with self._load_lock:
+                if self._index is None:
+                    with self._lock:
+                        self._refreshing = True
+                    try:
+                        self._swap(*self._build(client))
+                    except Exception:
+                        with self._lock:
+                            self._refreshing = False
+                            self._pending = []
+                        raise
+        with self._lock:
+            index = self._index
+            stale = time.monotonic() - self._loaded_at > self.refresh_seconds
+            start_refresh = stale and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+        if start_refresh:
+            threading.Thread(
+                target=self._refresh_in_background, args=(client,), name="vector-index-refresh", daemon=True
+            ).start()
+        return index
+
+    def search(self, client: Client, query: Sequence[float], k: int) -> List[Dict[str, Any]]:
+        # user embeddings read through PostgREST arrive as pgvector strings
+        return self.ensure_loaded(client).search(parse_vector(query), k)
+
+    def upsert_rows(self, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            index = self._index
+            if self._refreshing:
+                self._pending.extend(rows)
+        if index is None:
+            # not loaded yet; the first search reads these rows from the database
+            return
+        video_ids, vectors, metadata = split_embedding_rows(rows)
+        if video_ids:
+            index.upsert(video_ids, vectors, metadata)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._index
+            age = time.monotonic() - self._loaded_at if self._loaded_at is not None else None
+            stats = {
+                "backend": self.backend,
+                "loaded": index is not None,
+                "age_seconds": age,
+                "load_seconds": self._load_seconds,
+                "refreshing": self._refreshing,
+            }
+        if index is not None:
+            stats.update(index.stats())
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_vector_index() -> Optional[VectorIndexManager]:
+    """
+    Process-wide index manager, or None when VECTOR_INDEX_BACKEND=rpc (search stays in Postgres).
+    """
+    settings = get_settings()
+    if settings.vector_index_backend == "rpc":
+        return None
+    return VectorIndexManager(
+        backend=settings.vector_index_backend,
+        refresh_seconds=settings.vector_index_refresh_seconds,
+        page_size=settings.vector_index_page_size,
+    )
@@ -0,0 +1,251 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+from supabase import AsyncClient, Client
+
+from app.core.config import get_settings
+from app.services.recommendation_cache import bump_catalog_version
+from app.services.supabase_client import get_supabase_client
+from app.services.vector_index import get_vector_index
+
+
+def _ann_params() -> Dict[str, int]:
+    settings = get_settings()
+    return {"_ef_search": settings.pgvector_ef_search, "_probes": settings.pgvector_probes}
+
+
+def search_video_embeddings(client: Client, query: Sequence[float], limit: int) -> List[Dict[str, Any]]:
+    """
+    Nearest videos by cosine similarity, from the in-process index when one is
+    configured and from the `search_video_embeddings` RPC otherwise.
+    """
+    index = get_vector_index()
+    if index is not None:
+        return index.search(client, query, limit)
+    resp = client.rpc("search_video_embeddings", {"query": query, "_limit": limit, **_ann_params()}).execute()
+    return (resp.data if resp and getattr(resp, "data", None) else []) or []
+
+
+def rejection_reasons(
+    record: Dict[str, Any],
+    difficulty: Optional[str],
+    min_sentiment: float,
+    min_similarity: float,
+) -> List[str]:
+    # same predicates as search_video_embeddings_filtered in sql/embeddings.sql
+    reasons = []
+    if (record.get("similarity") or 0.0) < min_similarity:
+        reasons.append("similarity too low")
+    if difficulty and record.get("difficulty") != difficulty:
+        reasons.append("difficulty mismatch")
+    if record.get("sentiment_score") is not None and record.get("sentiment_score") < min_sentiment:
+        reasons.append("sentiment below threshold")
+    return reasons
+
+
+def _index_round(
+    client: Client,
+    query: Sequence[float],
+    limit: int,
+    candidates: int,
+    difficulty: Optional[str],
+    min_sentiment: float,
+    min_similarity: float,
+) -> tuple[List[Dict], List[Dict], int, Optional[float]]:
+    accepted, rejected = [], []
+    nearest = get_vector_index().search(client, query, candidates)
+    for record in nearest:
+        reasons = rejection_reasons(record, difficulty, min_sentiment, min_similarity)
+        if reasons:
+            rejected.append({**record, "accepted": False, "rejection_reason": "; ".join(reasons)})
+        elif len(accepted) < limit:
+            accepted.append({**record, "accepted": True})
+    lowest = nearest[-1].get("similarity") if nearest else None
+    return accepted, rejected, len(nearest), lowest
+
+
+def _rpc_params(
+    query: Sequence[float],
+    limit: int,
+    candidates: int,
+    difficulty: Optional[str],
+    min_sentiment: float,
+    min_similarity: float,
+    include_rejected: bool,
+) -> Dict[str, Any]:
+    return {
+        "query": query,
+        "_limit": limit,
+        "_candidates": candidates,
+        "_difficulty": difficulty,
+        "_min_sentiment": min_sentiment,
+        "_min_similarity": min_similarity,
+        "_include_rejected": include_rejected,
+        **_ann_params(),
+    }
+
+
+def _split_rpc_rows(
+    rows: List[Dict],
+    include_rejected: bool,
+) -> tuple[List[Dict], List[Dict], Optional[int], Optional[float]]:
+    # the scan stats repeat on every row; no rows at all means nothing was scanned
+    scanned = rows[0].get("candidates_scanned") if rows else 0
+    lowest = rows[0].get("lowest_similarity_scanned") if rows else None
+    for row in rows:
+        row.pop("candidates_scanned", None)
+        row.pop("lowest_similarity_scanned", None)
+    accepted = [row for row in rows if row["accepted"]]
+    for row in accepted:
+        row.pop("rejection_reason", None)
+    # without include_rejected the function still sends its least similar rejection
+    rejected = [row for row in rows if not row["accepted"]] if include_rejected else []
+    return accepted, rejected, scanned, lowest
+
+
+def _rpc_round(
+    client: Client,
+    query: Sequence[float],
+    limit: int,
+    candidates: int,
+    difficulty: Optional[str],
+    min_sentiment: float,
+    min_similarity: float,
+    include_rejected: bool,
+) -> tuple[List[Dict], List[Dict], Optional[int], Optional[float]]:
+    resp = client.rpc(
+        "search_video_embeddings_filtered",
+        _rpc_params(query, limit, candidates, difficulty, min_sentiment, min_similarity, include_rejected),
+    ).execute()
+    return _split_rpc_rows((resp.data if resp and getattr(resp, "data", None) else []) or [], include_rejected)
+
+
+def _initial_candidates(limit: int) -> tuple[int, int]:
+    settings = get_settings()
+    max_candidates = max(settings.search_max_candidates, limit)
+    return min(max(limit * settings.search_overfetch_factor, limit), max_candidates), max_candidates
+
+
+def _search_done(
+    accepted: List[Dict],
+    scanned: Optional[int],
+    lowest: Optional[float],
+    limit: int,
+    candidates: int,
+    max_candidates: int,
+    min_similarity: float,
+) -> bool:
+    exhausted = scanned is not None and scanned < candidates
+    # candidates arrive in similarity order, so once the scanned tail falls below the
+    # threshold a larger pool only adds rows that fail it
+    below_threshold = lowest is not None and lowest < min_similarity
+    return len(accepted) >= limit or exhausted or below_threshold or candidates >= max_candidates
+
+
+def _search_result(
+    accepted: List[Dict],
+    rejected: List[Dict],
+    scanned: Optional[int],
+    candidates: int,
+    rounds: int,
+    include_rejected: bool,
+) -> Dict[str, Any]:
+    return {
+        "accepted": accepted,
+        "rejected": rejected if include_rejected else [],
+        "candidates_scanned": scanned if scanned is not None else candidates,
+        "rounds": rounds,
+    }
+
+
+def search_video_embeddings_filtered(
+    client: Client,
+    query: Sequence[float],
+    limit: int,
+    difficulty: Optional[str] = None,
+    min_sentiment: float = 0.0,
+    min_similarity: float = 0.0,
+    include_rejected: bool = False,
+) -> Dict[str, Any]:
+    """
+    Nearest videos that pass the difficulty / sentiment / similarity filters. Filters run
+    inside retrieval; the candidate pool starts at `limit * SEARCH_OVERFETCH_FACTOR` and
+    doubles until `limit` rows are accepted, the catalog runs out, or the pool reaches
+    SEARCH_MAX_CANDIDATES. Rejected candidates (with reasons) are only returned when
+    `include_rejected` is set.
+    """
+    candidates, max_candidates = _initial_candidates(limit)
+    use_index = get_vector_index() is not None
+
+    rounds = 0
+    while True:
+        rounds += 1
+        if use_index:
+            accepted, rejected, scanned, lowest = _index_round(
+                client, query, limit, candidates, difficulty, min_sentiment, min_similarity
+            )
+        else:
+            accepted, rejected, scanned, lowest = _rpc_round(
+                client, query, limit, candidates, difficulty, min_sentiment, min_similarity, include_rejected
+            )
+        if _search_done(accepted, scanned, lowest, limit, candidates, max_candidates, min_similarity):
+            break
+        candidates = min(candidates * 2, max_candidates)
+
+    return _search_result(accepted, rejected, scanned, candidates, rounds, include_rejected)
+
+
+async def asearch_video_embeddings_filtered(
+    client: AsyncClient,
+    query: Sequence[float],
+    limit: int,
+    difficulty: Optional[str] = None,
+    min_sentiment: float = 0.0,
+    min_similarity: float = 0.0,
+    include_rejected: bool = False,
+) -> Dict[str, Any]:
+    """
+    search_video_embeddings_filtered for async routes. RPC rounds are awaited on the
+    AsyncClient; the in-process index is CPU-bound (and loads through the sync client),
+    so that path runs in the threadpool.
+    """
+    if get_vector_index() is not None:
+        return await run_in_threadpool(
+            search_video_embeddings_filtered,
+            get_supabase_client(),
+            query,
+            limit,
+            difficulty,
+            min_sentiment,
+            min_similarity,
+            include_rejected,
+        )
+
+    candidates, max_candidates = _initial_candidates(limit)
+    rounds = 0
+    while True:
+        rounds += 1
+        resp = await client.rpc(
+            "search_video_embeddings_filtered",
+            _rpc_params(query, limit, candidates, difficulty, min_sentiment, min_similarity, include_rejected),
+        ).execute()
+        rows = (resp.data if resp and getattr(resp, "data", None) else []) or []
+        accepted, rejected, scanned, lowest = _split_rpc_rows(rows, include_rejected)
+        if _search_done(accepted, scanned, lowest, limit, candidates, max_candidates, min_similarity):
+            break
+        candidates = min(candidates * 2, max_candidates)
+
+    return _search_result(accepted, rejected, scanned, candidates, rounds, include_rejected)
+
+
+def publish_video_embeddings(rows: List[Dict[str, Any]]) -> None:
+    """
+    Call after `video_embeddings` rows are written so the local index serves them
+    immediately and cached recommendations are invalidated.
+    """
+    if not rows:
+        return
+    bump_catalog_version()
+    index = get_vector_index()
+    if index is not None:
+        index.upsert_rows(rows)
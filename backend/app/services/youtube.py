@@ -1,12 +1,17 @@
+import asyncio
 import datetime as dt
-from typing import Dict, List, Optional
+import json
+import queue
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
 import httpx
 
 from app.core.config import get_settings
+from app.services.cache import get_cache
+from app.services.http_client import get_async_http_client, run_sync, submit_to_http_loop
 
-YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
-YOUTUBE_VIDEOS_URL = "https://www.googleapis.com/youtube/v3/videos"
+# videos.list accepts at most 50 comma-separated ids per request
+VIDEOS_LIST_MAX_IDS = 50
 
 
 def _parse_iso_duration(duration: str) -> int:
@@ -32,14 +37,180 @@ def _parse_iso_duration(duration: str) -> int:
     return total
 
 
-def fetch_youtube_metadata(
+def _parse_video_item(
+    item: Dict,
+    exclude_keywords: List[str],
+    cutoff_date: Optional[dt.datetime],
+    min_view_count: int,
+) -> Optional[Dict]:
+    """
+    Map a videos.list item to a `videos_raw` row, or None if it fails the filters.
+    """
+    video_id = item.get("id")
+    snippet = item.get("snippet", {})
+    stats = item.get("statistics", {})
+    content = item.get("contentDetails", {})
+
+    title = (snippet.get("title") or "").strip()
+    description = snippet.get("description") or ""
+    title_desc = f"{title} {description}".lower()
+
+    if any(bad in title_desc for bad in exclude_keywords):
+        return None
+
+    published_at = snippet.get("publishedAt")
+    published_dt = None
+    if published_at:
+        try:
+            published_dt = dt.datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+        except ValueError:
+            published_dt = None
+
+    if cutoff_date and published_dt and published_dt < cutoff_date:
+        return None
+
+    view_count = int(stats.get("viewCount", 0) or 0)
+    if view_count < min_view_count:
+        return None
+
+    return {
+        "video_id": video_id,
+        "title": title,
+        "description": description,
+        "channel_title": snippet.get("channelTitle"),
+        "published_at": published_dt.isoformat() if published_dt else None,
+        "duration_seconds": _parse_iso_duration(content.get("duration", "")),
+        "view_count": view_count,
+        "like_count": int(stats.get("likeCount", 0) or 0),
+        "fetched_at": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "raw": item,
+    }
+
+
+def _record(stats: Optional[Dict[str, int]], field: str, amount: int = 1) -> None:
+    if stats is not None:
+        stats[field] = stats.get(field, 0) + amount
+
+
+async def _search_topic(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    api_key: str,
+    topic: str,
+    max_results_per_topic: int,
+    order: str,
+    stats: Optional[Dict[str, int]] = None,
+) -> List[str]:
+    """
+    search.list for one topic, cached per (topic, order, maxResults).
+    """
+    settings = get_settings()
+    search_cache = get_cache("youtube_search")
+    search_key = json.dumps([topic, order, max_results_per_topic])
+    video_ids = await search_cache.aget(search_key)
+    if video_ids is not None:
+        _record(stats, "cache_hits")
+        return video_ids
+
+    search_params = {
+        "key": api_key,
+        "q": topic,
+        "part": "snippet",
+        "type": "video",
+        "maxResults": max_results_per_topic,
+        "order": order,
+        "safeSearch": "none",
+    }
+    async with semaphore:
+        search_resp = await client.get(
+            f"{settings.youtube_api_base_url}/search",
+            params=search_params,
+            headers={"Accept": "application/json"},
+        )
+    search_resp.raise_for_status()
+    _record(stats, "api_calls")
+    search_items = search_resp.json().get("items", [])
+    video_ids = [item["id"]["videoId"] for item in search_items if item.get("id", {}).get("videoId")]
+    await search_cache.aset(search_key, video_ids, settings.youtube_search_cache_ttl_seconds)
+    return video_ids
+
+
+async def _fetch_video_items(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    api_key: str,
+    video_ids: List[str],
+    stats: Optional[Dict[str, int]] = None,
+    on_items: Optional[Callable[[List[Dict]], None]] = None,
+) -> Dict[str, Dict]:
+    """
+    videos.list for many ids: cached items are served per video_id, the rest are
+    requested in concurrent chunks of VIDEOS_LIST_MAX_IDS. `on_items` sees the cached
+    items first and then each chunk as soon as its response arrives.
+    """
+    settings = get_settings()
+    video_cache = get_cache("youtube_videos")
+    # one MGET (off the loop for Redis) instead of a blocking GET per id
+    items_by_id: Dict[str, Dict] = await video_cache.aget_many(video_ids)
+    if items_by_id:
+        _record(stats, "cache_hits", len(items_by_id))
+        if on_items is not None:
+            on_items(list(items_by_id.values()))
+
+    missing = [video_id for video_id in video_ids if video_id not in items_by_id]
+
+    async def fetch_chunk(chunk: List[str]) -> List[Dict]:
+        video_params = {
+            "key": api_key,
+            "id": ",".join(chunk),
+            "part": "snippet,contentDetails,statistics",
+        }
+        async with semaphore:
+            video_resp = await client.get(
+                f"{settings.youtube_api_base_url}/videos",
+                params=video_params,
+                headers={"Accept": "application/json"},
+            )
+        video_resp.raise_for_status()
+        _record(stats, "api_calls")
+        items = video_resp.json().get("items", [])
+        if on_items is not None:
+            on_items(items)
+        return items
+
+    chunks = [missing[i : i + VIDEOS_LIST_MAX_IDS] for i in range(0, len(missing), VIDEOS_LIST_MAX_IDS)]
+    fetched: Dict[str, Dict] = {}
+    for items in await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks)):
+        for item in items:
+            fetched[item.get("id")] = item
+    await video_cache.aset_many(fetched, settings.youtube_video_cache_ttl_seconds)
+    items_by_id.update(fetched)
+    return items_by_id
+
+
+async def fetch_youtube_metadata_async(
     topics: List[str],
     max_results_per_topic: int = 5,
     min_view_count: int = 0,
     max_age_days: Optional[int] = 365,
     exclude_keywords: Optional[List[str]] = None,
     order: str = "relevance",
+    concurrency: Optional[int] = None,
+    stats: Optional[Dict[str, int]] = None,
+    select_video_ids: Optional[Callable[[List[str]], Iterable[str]]] = None,
+    on_page: Optional[Callable[[List[Dict]], None]] = None,
 ) -> List[Dict]:
+    """
+    Fan out searches across topics (at most `concurrency` requests in flight), fetch
+    details for the unique ids, then merge `topics_source` in topic order exactly like
+    the serial loop did. Runs on the shared HTTP loop (see `app.services.http_client`).
+
+    `select_video_ids` receives every id found by search and returns the ids whose
+    details should be fetched (incremental ingestion); it runs in a worker thread.
+    When `stats` is given it is filled with `api_calls` and `cache_hits` counters.
+    `on_page` receives the finished rows of each videos.list response (and of the
+    cached items) as it arrives, so callers can start on them before the fetch ends.
+    """
     settings = get_settings()
     api_key = settings.youtube_api_key
     if not api_key:
@@ -50,79 +221,108 @@ def fetch_youtube_metadata(
     if max_age_days:
         cutoff_date = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=max_age_days)
 
-    headers = {"Accept": "application/json"}
+    semaphore = asyncio.Semaphore(max(1, concurrency or settings.youtube_concurrency))
+    client = get_async_http_client()
+    per_topic = await asyncio.gather(
+        *(
+            _search_topic(client, semaphore, api_key, topic, max_results_per_topic, order, stats)
+            for topic in topics
+        )
+    )
+
+    unique_ids = list(dict.fromkeys(video_id for video_ids in per_topic for video_id in video_ids))
+    if select_video_ids is not None:
+        selected = set(await asyncio.to_thread(select_video_ids, unique_ids))
+        unique_ids = [video_id for video_id in unique_ids if video_id in selected]
+
+    # every topic that found an id, in topic order; insertion order is the result order
+    topics_by_id: Dict[str, List[str]] = {}
+    for topic, video_ids in zip(topics, per_topic):
+        for video_id in video_ids:
+            merged_topics = topics_by_id.setdefault(video_id, [])
+            if topic not in merged_topics:
+                merged_topics.append(topic)
+
     by_id: Dict[str, Dict] = {}
 
-    with httpx.Client(timeout=10) as client:
-        for topic in topics:
-            search_params = {
-                "key": api_key,
-                "q": topic,
-                "part": "snippet",
-                "type": "video",
-                "maxResults": max_results_per_topic,
-                "order": order,
-                "safeSearch": "none",
-            }
-
-            search_resp = client.get(YOUTUBE_SEARCH_URL, params=search_params, headers=headers)
-            search_resp.raise_for_status()
-            search_items = search_resp.json().get("items", [])
-
-            video_ids = [item["id"]["videoId"] for item in search_items if item.get("id", {}).get("videoId")]
-            if not video_ids:
+    def collect(items: List[Dict]) -> None:
+        page = []
+        for item in items:
+            if item.get("id") not in topics_by_id:
+                continue
+            parsed = _parse_video_item(item, exclude_keywords, cutoff_date, min_view_count)
+            if not parsed:
                 continue
+            record = {**parsed, "topics_source": topics_by_id[item["id"]]}
+            by_id[record["video_id"]] = record
+            page.append(record)
+        if page and on_page is not None:
+            on_page(page)
+
+    await _fetch_video_items(client, semaphore, api_key, unique_ids, stats, on_items=collect)
+    return [by_id[video_id] for video_id in topics_by_id if video_id in by_id]
+
+
+def fetch_youtube_metadata(
+    topics: List[str],
+    max_results_per_topic: int = 5,
+    min_view_count: int = 0,
+    max_age_days: Optional[int] = 365,
+    exclude_keywords: Optional[List[str]] = None,
+    order: str = "relevance",
+    stats: Optional[Dict[str, int]] = None,
+    select_video_ids: Optional[Callable[[List[str]], Iterable[str]]] = None,
+) -> List[Dict]:
+    """
+    Sync wrapper for callers running outside an event loop (sync routes, workers).
+    """
+    return run_sync(
+        fetch_youtube_metadata_async(
+            topics=topics,
+            max_results_per_topic=max_results_per_topic,
+            min_view_count=min_view_count,
+            max_age_days=max_age_days,
+            exclude_keywords=exclude_keywords,
+            order=order,
+            stats=stats,
+            select_video_ids=select_video_ids,
+        )
+    )
+
 
-            video_params = {
-                "key": api_key,
-                "id": ",".join(video_ids),
-                "part": "snippet,contentDetails,statistics",
-            }
-            video_resp = client.get(YOUTUBE_VIDEOS_URL, params=video_params, headers=headers)
-            video_resp.raise_for_status()
-            for item in video_resp.json().get("items", []):
-                video_id = item.get("id")
-                snippet = item.get("snippet", {})
-                stats = item.get("statistics", {})
-                content = item.get("contentDetails", {})
-
-                title = (snippet.get("title") or "").strip()
-                description = snippet.get("description") or ""
-                title_desc = f"{title} {description}".lower()
-
-                if any(bad in title_desc for bad in exclude_keywords):
-                    continue
-
-                published_at = snippet.get("publishedAt")
-                published_dt = None
-                if published_at:
-                    try:
-                        published_dt = dt.datetime.fromisoformat(published_at.replace("Z", "+00:00"))
-                    except ValueError:
-                        published_dt = None
-
-                if cutoff_date and published_dt and published_dt < cutoff_date:
-                    continue
-
-                view_count = int(stats.get("viewCount", 0) or 0)
-                if view_count < min_view_count:
-                    continue
-
-                record = by_id.get(video_id, {})
-                merged_topics = set(record.get("topics_source", []))
-                merged_topics.add(topic)
-
-                by_id[video_id] = {
-                    "video_id": video_id,
-                    "title": title,
-                    "description": description,
-                    "channel_title": snippet.get("channelTitle"),
-                    "published_at": published_dt.isoformat() if published_dt else None,
-                    "duration_seconds": _parse_iso_duration(content.get("duration", "")),
-                    "view_count": view_count,
-                    "like_count": int(stats.get("likeCount", 0) or 0),
-                    "topics_source": list(merged_topics),
-                    "raw": item,
-                }
-
-    return list(by_id.values())
+def iter_youtube_metadata_pages(
+    topics: List[str],
+    max_results_per_topic: int = 5,
+    min_view_count: int = 0,
+    max_age_days: Optional[int] = 365,
+    exclude_keywords: Optional[List[str]] = None,
+    order: str = "relevance",
+    stats: Optional[Dict[str, int]] = None,
+    select_video_ids: Optional[Callable[[List[str]], Iterable[str]]] = None,
+) -> Iterator[List[Dict]]:
+    """
+    Sync generator over the `on_page` pages of fetch_youtube_metadata_async: the fetch
+    runs on the HTTP loop while the caller works on the pages already yielded. Fetch
+    errors are raised after the last page that arrived.
+    """
+    pages: "queue.Queue" = queue.Queue()
+    future = submit_to_http_loop(
+        fetch_youtube_metadata_async(
+            topics=topics,
+            max_results_per_topic=max_results_per_topic,
+            min_view_count=min_view_count,
+            max_age_days=max_age_days,
+            exclude_keywords=exclude_keywords,
+            order=order,
+            stats=stats,
+            select_video_ids=select_video_ids,
+            on_page=pages.put,
+        )
+    )
+    future.add_done_callback(lambda _: pages.put(None))
+    while True:
+        page = pages.get()
+        if page is None:
+            break
+        yield page
+    future.result()
@@ -1,6 +1,12 @@
 from celery import Celery
+from celery.concurrency import get_implementation
+from celery.concurrency.prefork import TaskPool as PreforkPool
+from celery.concurrency.solo import TaskPool as SoloPool
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from kombu import Queue
 
 from app.core.config import get_settings
+from app.services.http_client import close_http_clients, open_http_clients
 
 settings = get_settings()
 
@@ -8,6 +14,69 @@ celery_app = Celery(
     "learntube",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    include=["app.worker.tasks"],
 )
 
-celery_app.conf.update(task_serializer="json", result_serializer="json", accept_content=["json"])
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # I/O-bound fetch tasks and CPU-bound model tasks run on differently sized pools:
+    #   celery -A app.worker.celery_app.celery_app worker -Q io --pool threads --concurrency 16
+    #   celery -A app.worker.celery_app.celery_app worker -Q cpu --concurrency 2
+    task_queues=(Queue("io"), Queue("cpu")),
+    task_default_queue="io",
+    task_routes={
+        "tasks.run_workflow": {"queue": "io"},
+        "tasks.fetch_comments": {"queue": "io"},
+        "tasks.enrich_videos": {"queue": "cpu"},
+        "tasks.embed_videos": {"queue": "cpu"},
+        "tasks.embed_video": {"queue": "cpu"},
+        "tasks.precompute_recommendations": {"queue": "cpu"},
+    },
+    # model tasks are long; don't let one worker prefetch a backlog of them
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_always_eager=settings.celery_task_always_eager,
+)
+
+
+@worker_process_init.connect
+def _open_http_clients(**_):
+    open_http_clients()
+
+
+def preload_models() -> None:
+    """
+    Load the embedding and NLP models now instead of on the first model task. Skipped
+    for workers that only consume the `io` queue.
+    """
+    consume_from = celery_app.amqp.queues.consume_from
+    if not settings.worker_preload_models or (consume_from and "cpu" not in consume_from):
+        return
+    from app.services.embeddings import _get_embedder
+    from app.services.nlp import _get_sentiment_analyzer, _get_zero_shot_classifier
+
+    _get_embedder()
+    if settings.enrichment_mode != "fast":
+        _get_zero_shot_classifier()
+    _get_sentiment_analyzer()
+
+
+@worker_process_init.connect
+def _preload_models(**_):
+    # prefork: once per child process, after the fork
+    preload_models()
+
+
+@worker_init.connect
+def _preload_models_in_worker(sender=None, **_):
+    # threads/gevent/eventlet pools run tasks in the main worker process and never send
+    # worker_process_init (prefork sends it per child after the fork, solo on start)
+    if sender is not None and not issubclass(get_implementation(sender.pool_cls), (PreforkPool, SoloPool)):
+        preload_models()
+
+
+@worker_process_shutdown.connect
+def _close_http_clients(**_):
+    close_http_clients()
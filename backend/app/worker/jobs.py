@@ -0,0 +1,130 @@
+import datetime as dt
+import threading
+import uuid
+from typing import Any, Dict, Optional
+
+from app.core.config import get_settings
+
+COUNTERS = (
+    "total_chunks",
+    "completed_chunks",
+    "failed_chunks",
+    "videos_enriched",
+    "videos_embedded",
+    "write_failures",
+)
+
+
+def _now() -> str:
+    return dt.datetime.now(dt.timezone.utc).isoformat()
+
+
+class MemoryJobStore:
+    """
+    In-process job state for eager Celery runs and local testing.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job_id] = {**{counter: 0 for counter in COUNTERS}, **fields}
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated_at=_now())
+
+    def increment(self, job_id: str, **amounts: int) -> Dict[str, Any]:
+        with self._lock:
+            job = self._jobs.get(job_id, {})
+            for field, amount in amounts.items():
+                job[field] = job.get(field, 0) + amount
+            job["updated_at"] = _now()
+            return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class RedisJobStore:
+    """
+    Job state as a Redis hash so API processes and workers see the same progress.
+    Counters use HINCRBY so concurrent chunk tasks never lose updates.
+    """
+
+    def __init__(self, redis_url: str, ttl_seconds: int):
+        import redis
+
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._ttl = ttl_seconds
+
+    def _key(self, job_id: str) -> str:
+        return f"learntube:job:{job_id}"
+
+    def create(self, job_id: str, fields: Dict[str, Any]) -> None:
+        key = self._key(job_id)
+        mapping = {**{counter: 0 for counter in COUNTERS}, **{k: v for k, v in fields.items() if v is not None}}
+        pipe = self._redis.pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, self._ttl)
+        pipe.execute()
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        mapping = {k: v for k, v in {**fields, "updated_at": _now()}.items() if v is not None}
+        self._redis.hset(self._key(job_id), mapping=mapping)
+
+    def increment(self, job_id: str, **amounts: int) -> Dict[str, Any]:
+        key = self._key(job_id)
+        pipe = self._redis.pipeline()
+        for field, amount in amounts.items():
+            pipe.hincrby(key, field, amount)
+        pipe.hset(key, "updated_at", _now())
+        pipe.execute()
+        return self.get(job_id) or {}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {key: int(value) if key in COUNTERS else value for key, value in raw.items()}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            settings = get_settings()
+            if settings.celery_task_always_eager:
+                _store = MemoryJobStore()
+            else:
+                _store = RedisJobStore(settings.redis_url, settings.job_ttl_seconds)
+        return _store
+
+
+def new_job(kind: str, **fields: Any) -> str:
+    job_id = uuid.uuid4().hex
+    get_job_store().create(
+        job_id,
+        {"job_id": job_id, "kind": kind, "status": "queued", "created_at": _now(), "updated_at": _now(), **fields},
+    )
+    return job_id
+
+
+def record_chunk_done(job_id: str, failed: bool = False, **amounts: int) -> None:
+    """
+    Count a finished chunk; the job completes once every chunk has finished or failed.
+    """
+    store = get_job_store()
+    job = store.increment(job_id, **{"failed_chunks" if failed else "completed_chunks": 1}, **amounts)
+    finished = job.get("completed_chunks", 0) + job.get("failed_chunks", 0)
+    if job.get("status") == "running" and finished >= job.get("total_chunks", 0):
+        store.update(job_id, status="completed_with_errors" if job.get("failed_chunks") else "completed")
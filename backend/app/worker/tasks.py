@@ -1,10 +1,142 @@
+from typing import Dict, List, Optional
+
+from celery import chain
+
+from app.core.config import get_settings
+from app.schemas.ingestion import YoutubeIngestRequest
+from app.services.batch_recommendations import precompute_recommendations as batch_precompute
+from app.services.bulk_writer import BulkUpserter
+from app.services.enrichment import (
+    apply_enrichment,
+    attach_embeddings,
+    embedding_row,
+    enrichment_row,
+    fetch_comments_many,
+)
+from app.services.ingestion import ingest_for_enrichment
+from app.services.supabase_client import get_supabase_client
+from app.services.vector_search import publish_video_embeddings
 from app.worker.celery_app import celery_app
+from app.worker.jobs import get_job_store, record_chunk_done
+
+
+@celery_app.task(name="tasks.run_workflow")
+def run_workflow(job_id: str, payload: Dict) -> Dict:
+    """
+    Ingest topics, then fan out one fetch_comments -> enrich_videos -> embed_videos
+    chain per chunk of videos. Progress is tracked per chunk in the job store.
+    """
+    store = get_job_store()
+    store.update(job_id, status="ingesting")
+    try:
+        ingest = ingest_for_enrichment(get_supabase_client(), YoutubeIngestRequest(**payload))
+    except Exception as exc:
+        store.update(job_id, status="failed", error=str(exc))
+        raise
+
+    to_enrich = ingest["to_enrich"]
+    size = get_settings().worker_chunk_size
+    chunks = [to_enrich[start : start + size] for start in range(0, len(to_enrich), size)]
+    store.update(
+        job_id,
+        status="running" if chunks else "completed",
+        ingested=ingest["ingested"],
+        skipped_fresh=ingest["skipped_fresh"],
+        skipped_unchanged=ingest["skipped_unchanged"],
+        total_chunks=len(chunks),
+    )
+    for chunk in chunks:
+        try:
+            chain(
+                fetch_comments.s(job_id, chunk),
+                enrich_videos.s(job_id),
+                embed_videos.s(job_id),
+            ).apply_async()
+        except Exception:  # noqa: BLE001
+            # eager mode runs the chain inline; the failing task already marked its chunk failed
+            continue
+    return {"job_id": job_id, "chunks": len(chunks)}
+
+
+def _fail_chunk(job_id: str, exc: Exception) -> None:
+    get_job_store().update(job_id, last_error=str(exc))
+    record_chunk_done(job_id, failed=True)
+
+
+@celery_app.task(name="tasks.fetch_comments")
+def fetch_comments(job_id: str, videos: List[Dict]) -> List[Dict]:
+    try:
+        comment_lists = fetch_comments_many([video["video_id"] for video in videos])
+    except Exception as exc:
+        _fail_chunk(job_id, exc)
+        raise
+    return [{**video, "comments": comments} for video, comments in zip(videos, comment_lists)]
+
+
+@celery_app.task(name="tasks.enrich_videos")
+def enrich_videos(videos: List[Dict], job_id: str) -> List[Dict]:
+    try:
+        comment_lists = [video.pop("comments", []) for video in videos]
+        enriched = apply_enrichment(videos, comment_lists)
+        with BulkUpserter(get_supabase_client(), "videos_raw", on_conflict="video_id") as writer:
+            writer.extend(enrichment_row(video) for video in enriched)
+    except Exception as exc:
+        _fail_chunk(job_id, exc)
+        raise
+    failed = set(writer.report.failed_keys)
+    if failed:
+        get_job_store().update(job_id, last_error=writer.report.errors[0])
+    get_job_store().increment(job_id, videos_enriched=len(enriched) - len(failed), write_failures=len(failed))
+    # rows that did not persist are not embedded either
+    return [video for video in enriched if video["video_id"] not in failed]
+
+
+@celery_app.task(name="tasks.embed_videos")
+def embed_videos(videos: List[Dict], job_id: str) -> Dict:
+    try:
+        rows = [embedding_row(video) for video in attach_embeddings(videos) if video["embedding"]]
+        with BulkUpserter(get_supabase_client(), "video_embeddings", on_conflict="video_id") as writer:
+            writer.extend(rows)
+    except Exception as exc:
+        _fail_chunk(job_id, exc)
+        raise
+    failed_keys = set(writer.report.failed_keys)
+    publish_video_embeddings([row for row in rows if row["video_id"] not in failed_keys])
+    failed = len(failed_keys)
+    if failed:
+        get_job_store().update(job_id, last_error=writer.report.errors[0])
+    record_chunk_done(job_id, videos_embedded=len(rows) - failed, write_failures=failed)
+    return {"job_id": job_id, "embedded": len(rows) - failed}
+
+
+@celery_app.task(name="tasks.precompute_recommendations")
+def precompute_recommendations(top_k: Optional[int] = None) -> Dict:
+    """
+    Batch top-k for every user into precomputed_recommendations (daily digests).
+    """
+    return batch_precompute(get_supabase_client(), top_k=top_k)
 
 
 @celery_app.task(name="tasks.embed_video")
 def embed_video(video_id: str) -> dict:
     """
-    Placeholder task for generating embeddings for a given video.
-    Connects to Hugging Face / OpenAI models and writes to Supabase vectors.
+    Embed a single already-enriched video from videos_raw.
     """
-    return {"video_id": video_id, "status": "pending"}
+    client = get_supabase_client()
+    resp = (
+        client.table("videos_raw")
+        .select("video_id, title, description, topic_tags, difficulty, sentiment_score")
+        .eq("video_id", video_id)
+        .maybe_single()
+        .execute()
+    )
+    video = resp.data if resp else None
+    if not video:
+        return {"video_id": video_id, "status": "not_found"}
+    embedded = attach_embeddings([video])[0]
+    if not embedded["embedding"]:
+        return {"video_id": video_id, "status": "empty"}
+    row = embedding_row(embedded)
+    client.table("video_embeddings").upsert(row, on_conflict="video_id").execute()
+    publish_video_embeddings([row])
+    return {"video_id": video_id, "status": "embedded"}
@@ -0,0 +1,17 @@
+"""
+Rebuild user_feedback_counts from recommendation_feedback. Run once after applying
+sql/feedback.sql to an existing database; safe to re-run.
+
+    cd backend
+    python -m scripts.backfill_feedback_counts
+"""
+from app.services.supabase_client import get_supabase_client
+
+
+def main() -> None:
+    resp = get_supabase_client().rpc("backfill_user_feedback_counts", {}).execute()
+    print(f"user_feedback_counts rows written: {resp.data}")
+
+
+if __name__ == "__main__":
+    main()
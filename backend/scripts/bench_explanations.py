@@ -0,0 +1,97 @@
+"""
+Wall time and token usage of sequential, concurrent and batched (shared user prefix,
+JSON output) explanation generation. Point it at the fake server (or any
+OpenAI-compatible endpoint):
+
+    cd backend
+    python -m scripts.fake_openai_server --delay 1.0 --jitter 1.0 --fail-rate 0.1 --drop-rate 0.1 &
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 OPENAI_API_KEY=fake HTTP_MAX_RETRIES=0 \\
+        python -m scripts.bench_explanations --videos 10 --batch-size 5
+
+Each run uses fresh video ids, so the explanation cache never short-circuits a call.
+Token counts are summed from each result's `usage`; batched results hold an even
+share of their call, and fallbacks (`batched=False`) their own call.
+"""
+import argparse
+import time
+import uuid
+from typing import Dict, List
+
+from app.services.explanations import (
+    agenerate_explanations_batched,
+    build_context_payload,
+    generate_explanation,
+    generate_explanations,
+)
+from app.services.http_client import close_http_clients, run_sync
+
+PROFILE = {"goals": ["Become a backend developer"], "main_objective": "Get a first job"}
+PREFERENCES = {"skill_levels": ["Beginner"], "learning_style": "hands-on"}
+
+
+def contexts(count: int) -> List[Dict[str, object]]:
+    run = uuid.uuid4().hex[:8]
+    return [
+        build_context_payload(
+            "bench-user",
+            PROFILE,
+            PREFERENCES,
+            None,
+            {"video_id": f"{run}-{idx}", "title": f"FastAPI tutorial part {idx}", "topic_tags": ["Web Development"]},
+            {"similarity": 0.8, "min_sentiment": 0.0, "difficulty_filter": None},
+        )
+        for idx in range(count)
+    ]
+
+
+def _tokens(results: List[Dict[str, object]], key: str) -> int:
+    return sum((result["usage"] or {}).get(key) or 0 for result in results)
+
+
+def summarize(name: str, seconds: float, results: List[Dict[str, object]]) -> None:
+    failed = sum(1 for result in results if result.get("error"))
+    fallbacks = sum(1 for result in results if result.get("batched") is False)
+    print(
+        f"{name:<11} wall={seconds:6.2f}s  ok={len(results) - failed}  failed={failed}  fallbacks={fallbacks}  "
+        f"prompt_tokens={_tokens(results, 'prompt_tokens')}  completion_tokens={_tokens(results, 'completion_tokens')}  "
+        f"total_tokens={_tokens(results, 'total_tokens')}"
+    )
+
+
+def sequential(batch: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    results = []
+    for context in batch:
+        try:
+            results.append(generate_explanation(context))
+        except Exception as exc:  # noqa: BLE001
+            results.append({"usage": {}, "error": str(exc) or exc.__class__.__name__})
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None, help="videos per batched call")
+    args = parser.parse_args()
+
+    try:
+        started = time.perf_counter()
+        results = sequential(contexts(args.videos))
+        summarize("sequential", time.perf_counter() - started, results)
+
+        started = time.perf_counter()
+        results = generate_explanations(contexts(args.videos), concurrency=args.concurrency)
+        summarize("concurrent", time.perf_counter() - started, results)
+
+        started = time.perf_counter()
+        results = run_sync(
+            agenerate_explanations_batched(contexts(args.videos), args.batch_size, concurrency=args.concurrency)
+        )
+        summarize("batched", time.perf_counter() - started, results)
+    finally:
+        close_http_clients()
+
+
+if __name__ == "__main__":
+    main()
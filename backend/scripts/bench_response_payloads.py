@@ -0,0 +1,126 @@
+"""
+Payload size and serialization time of the heavy routes' responses, verbose with
+FastAPI's default path (jsonable_encoder + JSONResponse) vs compact with
+ResponseShape (ORJSONResponse, no encoder pass). Payloads are synthetic but shaped
+like the real responses:
+
+    cd backend
+    python -m scripts.bench_response_payloads --limit 50 --explain-top 10 --repeat 2000
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.v1.embeddings import _compact_recommendations
+from app.api.v1.response_utils import ORJSONResponse, drop_keys
+from app.services.vector_index import EMBEDDING_DIM
+
+DESCRIPTION = "In this tutorial we build a REST API with FastAPI, Postgres and Docker, step by step. " * 20
+
+
+def record(idx: int, accepted: bool) -> Dict[str, Any]:
+    return {
+        "video_id": f"vid{idx:08d}",
+        "similarity": 0.9 - idx * 0.001,
+        "difficulty": "intermediate",
+        "sentiment_score": 0.71,
+        "topic_tags": ["Web Development", "Python", "Databases"],
+        "accepted": accepted,
+        **({} if accepted else {"rejection_reason": "sentiment below threshold"}),
+    }
+
+
+def context(idx: int) -> Dict[str, Any]:
+    return {
+        "user_id": "bench-user",
+        "goals": ["Become a backend developer", "Ship a side project"],
+        "main_objective": "Get a first job",
+        "weekly_time": "5-10h",
+        "skill_levels": ["Beginner"],
+        "learning_style": "hands-on",
+        "difficulty_preference": "gradual",
+        "user_embedding_created_at": "2026-01-01T00:00:00+00:00",
+        "video": {
+            "video_id": f"vid{idx:08d}",
+            "title": f"FastAPI tutorial part {idx}",
+            "description": DESCRIPTION,
+            "topics": ["Web Development"],
+            "difficulty": "intermediate",
+            "sentiment_score": 0.71,
+        },
+        "recommendation": {"similarity": 0.8, "min_sentiment": 0.0, "difficulty_filter": None},
+    }
+
+
+def payloads(limit: int, explain_top: int) -> Dict[str, tuple]:
+    embedding = np.random.default_rng(7).normal(size=EMBEDDING_DIM).astype(np.float32).tolist()
+    accepted = [record(idx, True) for idx in range(limit)]
+    usage = {"prompt_tokens": 310, "completion_tokens": 90, "total_tokens": 400}
+    results = [
+        {
+            "user_id": "bench-user",
+            "video_id": f"vid{idx:08d}",
+            "explanation": "This video fits your goal of becoming a backend developer. " * 3,
+            "usage": usage,
+            "cached": False,
+            "batched": False,
+            "context": context(idx),
+        }
+        for idx in range(explain_top)
+    ]
+    return {
+        "embed_user": (
+            {"user_id": "bench-user", "dimensions": EMBEDDING_DIM, "embedding": embedding, "goals": ["Backend"]},
+            drop_keys("embedding"),
+        ),
+        "recommend_videos": (
+            {
+                "user_id": "bench-user",
+                "accepted": accepted,
+                "rejected": [record(limit + idx, False) for idx in range(limit)],
+                "explain_candidates": accepted[:explain_top],
+                "cached": False,
+            },
+            _compact_recommendations,
+        ),
+        "explain_batch": (
+            {"user_id": "bench-user", "results": results},
+            lambda payload: {
+                **payload,
+                "results": [drop_keys("context")(result) for result in payload["results"]],
+            },
+        ),
+    }
+
+
+def timed(render: Callable[[], bytes], repeat: int) -> tuple:
+    body = render()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return len(body), (time.perf_counter() - started) * 1e6 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=50, help="accepted (and rejected) records per recommendation")
+    parser.add_argument("--explain-top", type=int, default=10, help="explain_candidates / explanation results")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'route':<17} {'verbose bytes':>13} {'us':>8} {'compact bytes':>14} {'us':>8} {'size':>6} {'time':>6}")
+    for name, (payload, compact) in payloads(args.limit, args.explain_top).items():
+        verbose_bytes, verbose_us = timed(lambda: JSONResponse(jsonable_encoder(payload)).body, args.repeat)
+        compact_bytes, compact_us = timed(lambda: ORJSONResponse(compact(payload)).body, args.repeat)
+        print(
+            f"{name:<17} {verbose_bytes:>13} {verbose_us:>8.1f} {compact_bytes:>14} {compact_us:>8.1f} "
+            f"{compact_bytes / verbose_bytes:>6.0%} {compact_us / verbose_us:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Latency and recall of the in-process vector index backends on synthetic 384-d
+embeddings (clustered, unit-normalized, like MiniLM output). Ground truth is an
+exact matrix product, so the numpy backend always has recall 1.0.
+
+    cd backend
+    python -m scripts.bench_vector_index --sizes 10000 100000 1000000 --queries 200 --k 10
+
+The hnsw backend is skipped unless `hnswlib` is installed. 1M vectors need ~1.5 GB
+for the matrix plus ~1 GB for the graph.
+"""
+import argparse
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.vector_index import EMBEDDING_DIM, HnswVectorIndex, NumpyVectorIndex
+
+BUILD_CHUNK = 50_000
+
+
+def synthetic_vectors(rng: np.random.Generator, centers: np.ndarray, count: int) -> np.ndarray:
+    assignment = rng.integers(0, len(centers), size=count)
+    vectors = centers[assignment] + rng.normal(scale=0.35, size=(count, EMBEDDING_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(backend: str, size: int, seed: int, ef_search: int):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(256, EMBEDDING_DIM)).astype(np.float32)
+    index = NumpyVectorIndex(capacity=size) if backend == "numpy" else HnswVectorIndex(capacity=size, ef_search=ef_search)
+    started = time.perf_counter()
+    for start in range(0, size, BUILD_CHUNK):
+        count = min(BUILD_CHUNK, size - start)
+        vectors = synthetic_vectors(rng, centers, count)
+        ids = [f"v{start + offset}" for offset in range(count)]
+        index.upsert(ids, vectors, [{} for _ in ids])
+    return index, time.perf_counter() - started, centers
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run(
+    backend: str,
+    size: int,
+    queries: int,
+    k: int,
+    seed: int,
+    ef_search: int,
+    exact: Optional[NumpyVectorIndex] = None,
+) -> Dict:
+    index, build_seconds, centers = build(backend, size, seed, ef_search)
+    query_vectors = synthetic_vectors(np.random.default_rng(seed + 1), centers, queries)
+
+    timings, recalls = [], []
+    for query in query_vectors:
+        started = time.perf_counter()
+        results = index.search(query, k)
+        timings.append((time.perf_counter() - started) * 1000.0)
+        if exact is not None:
+            truth = {row["video_id"] for row in exact.search(query, k)}
+            recalls.append(len(truth & {row["video_id"] for row in results}) / k)
+
+    return {
+        "index": index,
+        "build_seconds": build_seconds,
+        "p50_ms": percentile(timings, 0.50),
+        "p99_ms": percentile(timings, 0.99),
+        "recall": float(np.mean(recalls)) if recalls else 1.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    try:
+        import hnswlib  # noqa: F401
+
+        backends = ["numpy", "hnsw"]
+    except ImportError:
+        print("hnswlib not installed; benchmarking numpy only")
+        backends = ["numpy"]
+
+    print(f"{'size':>9} {'backend':<7} {'build s':>9} {'p50 ms':>8} {'p99 ms':>8} {'recall@' + str(args.k):>10}")
+    for size in args.sizes:
+        exact = None
+        for backend in backends:
+            result = run(backend, size, args.queries, args.k, args.seed, args.ef_search, exact)
+            if backend == "numpy":
+                exact = result["index"]
+            print(
+                f"{size:>9} {backend:<7} {result['build_seconds']:>9.2f} {result['p50_ms']:>8.2f} "
+                f"{result['p99_ms']:>8.2f} {result['recall']:>10.3f}"
+            )
+        del exact
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Compare per-video latency of the legacy two-call zero-shot path (difficulty + topics
+through the HF pipeline) against the fused single-pass `enrich_text`.
+
+    cd backend
+    python -m scripts.bench_zero_shot --repeat 3
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from app.services.nlp import (
+    DIFFICULTY_HYPOTHESIS,
+    DIFFICULTY_LABELS,
+    TOPIC_CANDIDATES,
+    TOPIC_HYPOTHESIS,
+    _get_zero_shot_classifier,
+    enrich_text,
+)
+
+SAMPLE_TEXTS = [
+    "React Hooks Tutorial for Beginners useState and useEffect explained step by step with examples.",
+    "Advanced FastAPI: dependency injection, background tasks, async database sessions and testing.",
+    "Machine Learning Basics - linear regression, gradient descent and overfitting in 20 minutes.",
+    "SQL joins explained: inner, left, right and full outer joins with practical PostgreSQL queries.",
+    "Kubernetes for DevOps engineers: deployments, services, ingress and Helm charts in production.",
+    "Design systems at scale: tokens, component libraries and accessibility reviews for product teams.",
+    "Python Basics crash course: variables, loops, functions, lists and dictionaries for absolute beginners.",
+    "Data Science project walkthrough: cleaning data with pandas, feature engineering and model evaluation.",
+]
+
+
+def legacy_enrich(text: str, max_tags: int = 3, threshold: float = 0.25) -> Dict[str, object]:
+    classifier = _get_zero_shot_classifier()
+    diff = classifier(text, DIFFICULTY_LABELS, hypothesis_template=DIFFICULTY_HYPOTHESIS)
+    topics_result = classifier(text, TOPIC_CANDIDATES, hypothesis_template=TOPIC_HYPOTHESIS, multi_label=True)
+    topics = [
+        label for label, score in zip(topics_result["labels"], topics_result["scores"]) if score >= threshold
+    ][:max_tags]
+    return {"difficulty": {"label": diff["labels"][0], "score": float(diff["scores"][0])}, "topics": topics}
+
+
+def time_path(fn: Callable[[str], Dict[str, object]], texts: List[str], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        for text in texts:
+            started = time.perf_counter()
+            fn(text)
+            timings.append((time.perf_counter() - started) * 1000.0)
+    return timings
+
+
+def summarize(name: str, timings: List[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<8} mean={statistics.mean(timings):8.1f} ms  p50={statistics.median(timings):8.1f} ms  p95={p95:8.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # warm-up loads the model once so it is not billed to either path
+    enrich_text(SAMPLE_TEXTS[0])
+
+    legacy = time_path(legacy_enrich, SAMPLE_TEXTS, args.repeat)
+    fused = time_path(enrich_text, SAMPLE_TEXTS, args.repeat)
+    summarize("legacy", legacy)
+    summarize("fused", fused)
+    print(f"speedup  {statistics.mean(legacy) / statistics.mean(fused):.2f}x per video")
+
+    mismatches = 0
+    for text in SAMPLE_TEXTS:
+        a, b = legacy_enrich(text), enrich_text(text)
+        if a["difficulty"]["label"] != b["difficulty"]["label"] or a["topics"] != b["topics"]:
+            mismatches += 1
+            print(f"mismatch: {text[:60]!r}\n  legacy={a}\n  fused ={b}")
+    print(f"output agreement: {len(SAMPLE_TEXTS) - mismatches}/{len(SAMPLE_TEXTS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Agreement/accuracy report for the "fast" prototype enrichment mode against the
+BART-MNLI zero-shot path, treating BART as the reference labels.
+
+    cd backend
+    python -m scripts.compare_enrichment_modes --limit 500 --output enrichment_report.json
+    python -m scripts.compare_enrichment_modes --sample   # built-in texts, no Supabase needed
+"""
+import argparse
+import json
+import time
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+from app.services.embeddings import embed_texts
+from app.services.enrichment import video_text
+from app.services.nlp import DIFFICULTY_LABELS, enrich_texts
+from app.services.prototype_classifier import classify_embeddings
+
+THRESHOLD_SWEEP = [0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5]
+
+
+def load_texts(limit: int) -> List[str]:
+    from app.services.supabase_client import get_supabase_client
+
+    client = get_supabase_client()
+    resp = client.table("videos_raw").select("title, description").limit(limit).execute()
+    return [text for text in (video_text(row) for row in resp.data or []) if text]
+
+
+def topic_scores(reference: List[List[str]], predicted: List[List[str]]) -> Dict[str, float]:
+    tp = fp = fn = exact = 0
+    for ref, pred in zip(reference, predicted):
+        ref_set, pred_set = set(ref), set(pred)
+        tp += len(ref_set & pred_set)
+        fp += len(pred_set - ref_set)
+        fn += len(ref_set - pred_set)
+        exact += ref_set == pred_set
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "exact_match": exact / len(reference) if reference else 0.0,
+    }
+
+
+def build_report(texts: List[str]) -> Dict[str, object]:
+    started = time.perf_counter()
+    reference = enrich_texts(texts, mode="zero_shot")
+    bart_ms = (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    vectors = np.asarray(embed_texts(texts), dtype=np.float32)
+    fast = classify_embeddings(vectors)
+    fast_ms = (time.perf_counter() - started) * 1000.0
+
+    ref_difficulty = [r["difficulty"]["label"] for r in reference]
+    fast_difficulty = [r["difficulty"]["label"] for r in fast]
+    agreement = sum(a == b for a, b in zip(ref_difficulty, fast_difficulty)) / len(texts)
+    confusion = Counter(zip(ref_difficulty, fast_difficulty))
+
+    ref_topics = [r["topics"] for r in reference]
+    sweep = {
+        str(threshold): topic_scores(ref_topics, [r["topics"] for r in classify_embeddings(vectors, threshold=threshold)])
+        for threshold in THRESHOLD_SWEEP
+    }
+
+    return {
+        "videos": len(texts),
+        "latency_ms_per_video": {"zero_shot": bart_ms / len(texts), "fast": fast_ms / len(texts)},
+        "difficulty": {
+            "agreement": agreement,
+            "confusion": {
+                ref: {pred: confusion.get((ref, pred), 0) for pred in DIFFICULTY_LABELS} for ref in DIFFICULTY_LABELS
+            },
+        },
+        "topics": topic_scores(ref_topics, [r["topics"] for r in fast]),
+        "topic_threshold_sweep": sweep,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=200, help="videos to load from videos_raw")
+    parser.add_argument("--sample", action="store_true", help="use built-in sample texts instead of Supabase")
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    if args.sample:
+        from scripts.bench_zero_shot import SAMPLE_TEXTS
+
+        texts = SAMPLE_TEXTS
+    else:
+        texts = load_texts(args.limit)
+    if not texts:
+        raise SystemExit("No texts to compare.")
+
+    report = build_report(texts)
+    rendered = json.dumps(report, indent=2)
+    print(rendered)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(rendered)
+
+
+if __name__ == "__main__":
+    main()
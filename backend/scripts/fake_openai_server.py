@@ -0,0 +1,112 @@
+"""
+Minimal OpenAI-compatible chat completions server for exercising the explanation
+service without real API calls (latency, timeouts, failures, usage accounting).
+
+    cd backend
+    python -m scripts.fake_openai_server --port 8090 --delay 1.5 --jitter 0.5 --fail-rate 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8090/v1 OPENAI_API_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+app = FastAPI(title="fake-openai")
+CONFIG = {"delay": 1.0, "jitter": 0.0, "fail_rate": 0.0, "drop_rate": 0.0}
+BATCH_VIDEO_RE = re.compile(r"^Video (\S+):$", re.MULTILINE)
+
+
+def _words(text: str) -> int:
+    return max(len(text.split()), 1)
+
+
+def _stream(completion_id: str, model: str, content: str, usage: dict):
+    # first token after the configured delay (already slept), the rest spread over ~0.2s
+    words = content.split(" ")
+
+    def chunk(choices, usage=None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            "usage": usage,
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        for position, word in enumerate(words):
+            delta = {"content": word if position == 0 else " " + word}
+            if position == 0:
+                delta["role"] = "assistant"
+            yield chunk([{"index": 0, "delta": delta, "finish_reason": None}])
+            await asyncio.sleep(0.2 / len(words))
+        yield chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage:
+            yield chunk([], usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    await asyncio.sleep(CONFIG["delay"] + random.uniform(0, CONFIG["jitter"]))
+    if random.random() < CONFIG["fail_rate"]:
+        raise HTTPException(status_code=500, detail="injected failure")
+
+    prompt = " ".join(str(message.get("content", "")) for message in body.get("messages", []))
+    content = f"Fake explanation ({uuid.uuid4().hex[:8]}): this video matches the stated goals."
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        # batched prompt: one entry per listed video, minus the ones dropped to exercise fallbacks
+        entries = [
+            {"video_id": video_id, "explanation": f"{content} ({video_id})"}
+            for video_id in BATCH_VIDEO_RE.findall(prompt)
+            if random.random() >= CONFIG["drop_rate"]
+        ]
+        content = json.dumps({"explanations": entries})
+    prompt_tokens, completion_tokens = _words(prompt), _words(content)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    if body.get("stream"):
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+        return _stream(completion_id, body.get("model", "fake"), content, usage if include_usage else None)
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per completion")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of calls answered with HTTP 500")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of videos left out of batched answers")
+    args = parser.parse_args()
+
+    CONFIG.update(delay=args.delay, jitter=args.jitter, fail_rate=args.fail_rate, drop_rate=args.drop_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Export, verify and benchmark the ONNX Runtime inference backend.
+
+    cd backend
+    python -m scripts.onnx_models export [--no-quantize]
+    python -m scripts.onnx_models verify [--quantized]
+    python -m scripts.onnx_models bench [--quantized] [--repeat 5]
+
+`verify` loads both backends in-process and fails if outputs drift beyond tolerance.
+`bench` runs each backend in a fresh subprocess so latency and peak RSS are isolated.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from scripts.bench_zero_shot import SAMPLE_TEXTS
+
+SAMPLE_COMMENTS = [
+    "This was super helpful, thanks!",
+    "Way too fast, I got lost halfway through.",
+    "Decent overview but the audio is bad.",
+    "Best explanation of hooks I've seen.",
+]
+
+
+def _configure(backend: str, quantized: bool) -> None:
+    os.environ["INFERENCE_BACKEND"] = backend
+    os.environ["ONNX_QUANTIZE"] = "true" if quantized else "false"
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    os.environ["EMBEDDING_BATCHING_ENABLED"] = "false"
+
+
+def run_models(repeat: int) -> Dict[str, object]:
+    from app.services.embeddings import _get_embedder, embed_texts
+    from app.services.nlp import (
+        DIFFICULTY_HYPOTHESIS,
+        DIFFICULTY_LABELS,
+        TOPIC_CANDIDATES,
+        TOPIC_HYPOTHESIS,
+        _get_sentiment_analyzer,
+        _get_zero_shot_classifier,
+        _nli_logits,
+    )
+
+    started = time.perf_counter()
+    _get_embedder()
+    _get_zero_shot_classifier()
+    _get_sentiment_analyzer()
+    load_s = time.perf_counter() - started
+
+    hypotheses = [DIFFICULTY_HYPOTHESIS.format(label) for label in DIFFICULTY_LABELS]
+    hypotheses += [TOPIC_HYPOTHESIS.format(topic) for topic in TOPIC_CANDIDATES]
+
+    timings: Dict[str, List[float]] = {"embedding": [], "zero_shot": [], "sentiment": []}
+    outputs: Dict[str, object] = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        outputs["embeddings"] = embed_texts(SAMPLE_TEXTS)
+        timings["embedding"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        outputs["nli_probs"] = _nli_logits(SAMPLE_TEXTS, hypotheses).softmax(dim=-1).tolist()
+        timings["zero_shot"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        outputs["sentiment"] = _get_sentiment_analyzer()(SAMPLE_COMMENTS, truncation=True)
+        timings["sentiment"].append(time.perf_counter() - started)
+
+    per_text = {
+        name: 1000.0 * float(np.median(values)) / len(SAMPLE_TEXTS if name != "sentiment" else SAMPLE_COMMENTS)
+        for name, values in timings.items()
+    }
+    return {
+        "load_seconds": load_s,
+        "latency_ms_per_input": per_text,
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+        "outputs": outputs,
+    }
+
+
+def drift(reference: Dict[str, object], candidate: Dict[str, object]) -> Dict[str, float]:
+    ref_emb = np.asarray(reference["embeddings"], dtype=np.float32)
+    cand_emb = np.asarray(candidate["embeddings"], dtype=np.float32)
+    ref_nli = np.asarray(reference["nli_probs"], dtype=np.float32)
+    cand_nli = np.asarray(candidate["nli_probs"], dtype=np.float32)
+    ref_sent = [pred["label"] for pred in reference["sentiment"]]
+    cand_sent = [pred["label"] for pred in candidate["sentiment"]]
+    return {
+        "embedding_min_cosine": float((ref_emb * cand_emb).sum(axis=1).min()),
+        "nli_max_abs_prob_diff": float(np.abs(ref_nli - cand_nli).max()),
+        "nli_argmax_agreement": float((ref_nli.argmax(-1) == cand_nli.argmax(-1)).mean()),
+        "sentiment_label_agreement": sum(a == b for a, b in zip(ref_sent, cand_sent)) / len(ref_sent),
+    }
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    from app.services.model_backend import export_onnx_models
+
+    export_onnx_models(quantize=not args.no_quantize)
+    print("export complete")
+
+
+def _run_isolated(backend: str, quantized: bool, repeat: int) -> Dict[str, object]:
+    cmd = [sys.executable, "-m", "scripts.onnx_models", "_run", "--backend", backend, "--repeat", str(repeat)]
+    if quantized:
+        cmd.append("--quantized")
+    proc = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    _configure(args.backend, args.quantized)
+    print(json.dumps(run_models(args.repeat)))
+
+
+def cmd_verify(args: argparse.Namespace) -> None:
+    reference = _run_isolated("torch", False, 1)
+    candidate = _run_isolated("onnx", args.quantized, 1)
+    report = drift(reference, candidate)
+    print(json.dumps(report, indent=2))
+    ok = (
+        report["embedding_min_cosine"] >= args.min_cosine
+        and report["nli_argmax_agreement"] >= args.min_agreement
+        and report["sentiment_label_agreement"] >= args.min_agreement
+    )
+    if not ok:
+        raise SystemExit("ONNX outputs drift beyond tolerance")
+    print("verify ok")
+
+
+def cmd_bench(args: argparse.Namespace) -> None:
+    reference = _run_isolated("torch", False, args.repeat)
+    candidate = _run_isolated("onnx", args.quantized, args.repeat)
+    label = "onnx-int8" if args.quantized else "onnx"
+    report = {
+        name: {key: value for key, value in result.items() if key != "outputs"}
+        for name, result in (("torch", reference), (label, candidate))
+    }
+    report["drift"] = drift(reference, candidate)
+    print(json.dumps(report, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export")
+    export.add_argument("--no-quantize", action="store_true")
+    export.set_defaults(func=cmd_export)
+
+    verify = sub.add_parser("verify")
+    verify.add_argument("--quantized", action="store_true")
+    verify.add_argument("--min-cosine", type=float, default=0.99)
+    verify.add_argument("--min-agreement", type=float, default=0.9)
+    verify.set_defaults(func=cmd_verify)
+
+    bench = sub.add_parser("bench")
+    bench.add_argument("--quantized", action="store_true")
+    bench.add_argument("--repeat", type=int, default=5)
+    bench.set_defaults(func=cmd_bench)
+
+    run = sub.add_parser("_run")
+    run.add_argument("--backend", choices=["torch", "onnx"], required=True)
+    run.add_argument("--quantized", action="store_true")
+    run.add_argument("--repeat", type=int, default=5)
+    run.set_defaults(func=cmd_run)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
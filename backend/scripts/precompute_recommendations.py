@@ -0,0 +1,29 @@
+"""
+Compute top-k recommendations for every user and write precomputed_recommendations.
+
+    cd backend
+    python -m scripts.precompute_recommendations --top-k 20
+
+Memory is the video catalog (~1.5 GB per 1M videos) plus one
+PRECOMPUTE_USER_BLOCK x PRECOMPUTE_VIDEO_BLOCK float32 score block.
+"""
+import argparse
+import json
+import logging
+
+from app.services.batch_recommendations import precompute_recommendations
+from app.services.supabase_client import get_supabase_client
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    summary = precompute_recommendations(get_supabase_client(), top_k=args.top_k)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,22 +18,141 @@ create table if not exists public.user_embeddings (
   updated_at timestamptz not null default now()
 );
 
-create function public.search_video_embeddings(query vector, _limit integer)
+-- earlier versions: the two-argument search would make calls ambiguous, and the
+-- filtered search's return type changed, which `create or replace` cannot do
+drop function if exists public.search_video_embeddings(vector, integer);
+drop function if exists public.search_video_embeddings_filtered(vector, integer, integer, text, numeric, float, boolean);
+drop function if exists public.search_video_embeddings_filtered(
+  vector, integer, integer, text, numeric, float, boolean, integer, integer
+);
+
+-- `_ef_search` (HNSW) and `_probes` (IVFFlat) trade recall for latency once the index
+-- from embeddings_ann_index.sql exists; without it they are ignored. They only last for
+-- the calling transaction (so the search functions are volatile, not stable). HNSW
+-- returns at most ef_search rows, so it is raised to the number of rows requested
+-- (pgvector caps it at 1000).
+create or replace function public._set_vector_search_params(_rows integer, _ef_search integer, _probes integer)
+returns void language plpgsql as $$
+begin
+  if _ef_search is not null then
+    perform set_config('hnsw.ef_search', least(greatest(_ef_search, _rows), 1000)::text, true);
+  end if;
+  if _probes is not null then
+    perform set_config('ivfflat.probes', greatest(_probes, 1)::text, true);
+  end if;
+end;
+$$;
+
+create or replace function public.search_video_embeddings(
+  query vector,
+  _limit integer,
+  _ef_search integer default null,
+  _probes integer default null
+)
 returns table(
   video_id text,
   similarity float,
   difficulty text,
   sentiment_score numeric,
   topic_tags text[]
-) language sql stable as $$
+) language plpgsql as $$
+#variable_conflict use_column
+begin
+  perform public._set_vector_search_params(_limit, _ef_search, _probes);
+  return query
+  with nearest as (
+    select ve.video_id, ve.embedding <=> query as distance
+    from public.video_embeddings ve
+    order by ve.embedding <=> query
+    limit _limit
+  )
   select
-    ve.video_id,
-    1 - (ve.embedding <=> query) as similarity,
+    n.video_id,
+    1 - n.distance,
     v.difficulty,
     v.sentiment_score,
     v.topic_tags
-  from public.video_embeddings ve
-  join public.videos_raw v on v.video_id = ve.video_id
-  order by ve.embedding <=> query
-  limit _limit;
+  from nearest n
+  join public.videos_raw v on v.video_id = n.video_id
+  order by n.distance;
+end;
+$$;
+
+-- Nearest `_candidates` videos by cosine distance, with the recommendation filters
+-- applied inside the query. Accepted rows come first (up to `_limit`); rejected
+-- rows and their reasons are only returned when `_include_rejected` is set.
+-- `candidates_scanned` < `_candidates` means the catalog ran out of neighbours, and
+-- `lowest_similarity_scanned` below `_min_similarity` means a larger pool cannot
+-- accept more. Both are on every row; so that they arrive even when nothing passes,
+-- the least similar rejected row is always returned (callers drop it).
+create or replace function public.search_video_embeddings_filtered(
+  query vector,
+  _limit integer,
+  _candidates integer,
+  _difficulty text default null,
+  _min_sentiment numeric default 0,
+  _min_similarity float default 0,
+  _include_rejected boolean default false,
+  _ef_search integer default null,
+  _probes integer default null
+)
+returns table(
+  video_id text,
+  similarity float,
+  difficulty text,
+  sentiment_score numeric,
+  topic_tags text[],
+  accepted boolean,
+  rejection_reason text,
+  candidates_scanned integer,
+  lowest_similarity_scanned float
+) language plpgsql as $$
+#variable_conflict use_column
+begin
+  perform public._set_vector_search_params(_candidates, _ef_search, _probes);
+  return query
+  with nearest as (
+    select
+      ve.video_id,
+      1 - (ve.embedding <=> query) as similarity
+    from public.video_embeddings ve
+    order by ve.embedding <=> query
+    limit _candidates
+  ),
+  judged as (
+    select
+      n.video_id,
+      n.similarity,
+      v.difficulty,
+      v.sentiment_score,
+      v.topic_tags,
+      nullif(concat_ws('; ',
+        case when n.similarity < _min_similarity then 'similarity too low' end,
+        case when _difficulty is not null and v.difficulty is distinct from _difficulty then 'difficulty mismatch' end,
+        case when v.sentiment_score < _min_sentiment then 'sentiment below threshold' end
+      ), '') as rejection_reason
+    from nearest n
+    join public.videos_raw v on v.video_id = n.video_id
+  ),
+  scanned as (
+    select count(*)::integer as total, min(similarity)::float as lowest from nearest
+  )
+  (
+    select j.video_id, j.similarity::float, j.difficulty, j.sentiment_score, j.topic_tags,
+      true, null::text, s.total, s.lowest
+    from judged j, scanned s
+    where j.rejection_reason is null
+    order by j.similarity desc
+    limit _limit
+  )
+  union all
+  (
+    select j.video_id, j.similarity::float, j.difficulty, j.sentiment_score, j.topic_tags,
+      false, j.rejection_reason, s.total, s.lowest
+    from judged j, scanned s
+    where j.rejection_reason is not null
+      and (_include_rejected or j.similarity = s.lowest)
+    order by j.similarity desc
+  );
+end;
 $$;
@@ -0,0 +1,17 @@
+-- Optional, apply after embeddings.sql. Adds an approximate (HNSW) cosine index to
+-- video_embeddings; the search functions there already pass its query-time knobs
+-- (`_ef_search`, `_probes`). Requires pgvector >= 0.5.0.
+--
+-- Build the index outside a transaction so writes are not blocked:
+--   psql "$DATABASE_URL" -f backend/sql/embeddings_ann_index.sql
+-- Raise maintenance_work_mem for large catalogs so the graph is built in memory.
+
+create index concurrently if not exists video_embeddings_embedding_hnsw_idx
+  on public.video_embeddings using hnsw (embedding vector_cosine_ops)
+  with (m = 16, ef_construction = 64);
+
+-- IVFFlat alternative (faster to build, lower recall at the same latency). Create it
+-- once the table is populated; lists ~ rows / 1000 up to 1M rows, sqrt(rows) beyond:
+-- create index concurrently if not exists video_embeddings_embedding_ivfflat_idx
+--   on public.video_embeddings using ivfflat (embedding vector_cosine_ops)
+--   with (lists = 100);
@@ -7,3 +7,63 @@ create table if not exists public.recommendation_feedback (
 );
 
 create index if not exists idx_recommendation_feedback_user_video on public.recommendation_feedback(user_id, video_id);
+
+-- Per-user feedback counters so recommendation requests read one row instead of
+-- counting every recommendation_feedback row. Kept in step by record_recommendation_feedback;
+-- rebuild from the raw table with backfill_user_feedback_counts().
+create table if not exists public.user_feedback_counts (
+  user_id uuid primary key references auth.users(id) on delete cascade,
+  helpful integer not null default 0,
+  not_helpful integer not null default 0,
+  too_easy integer not null default 0,
+  too_hard integer not null default 0,
+  updated_at timestamptz not null default now()
+);
+
+-- Insert the feedback row and bump the matching counter in one transaction.
+create or replace function public.record_recommendation_feedback(_user_id uuid, _video_id text, _feedback_type text)
+returns void language sql as $$
+  insert into public.recommendation_feedback (user_id, video_id, feedback_type)
+  values (_user_id, _video_id, _feedback_type);
+
+  insert into public.user_feedback_counts as c (user_id, helpful, not_helpful, too_easy, too_hard)
+  values (
+    _user_id,
+    (_feedback_type = 'helpful')::int,
+    (_feedback_type = 'not_helpful')::int,
+    (_feedback_type = 'too_easy')::int,
+    (_feedback_type = 'too_hard')::int
+  )
+  on conflict (user_id) do update set
+    helpful = c.helpful + excluded.helpful,
+    not_helpful = c.not_helpful + excluded.not_helpful,
+    too_easy = c.too_easy + excluded.too_easy,
+    too_hard = c.too_hard + excluded.too_hard,
+    updated_at = now();
+$$;
+
+-- Recompute counters from recommendation_feedback. Returns the number of users written.
+create or replace function public.backfill_user_feedback_counts()
+returns integer language plpgsql as $$
+declare
+  written integer;
+begin
+  insert into public.user_feedback_counts (user_id, helpful, not_helpful, too_easy, too_hard)
+  select
+    user_id,
+    count(*) filter (where feedback_type = 'helpful'),
+    count(*) filter (where feedback_type = 'not_helpful'),
+    count(*) filter (where feedback_type = 'too_easy'),
+    count(*) filter (where feedback_type = 'too_hard')
+  from public.recommendation_feedback
+  group by user_id
+  on conflict (user_id) do update set
+    helpful = excluded.helpful,
+    not_helpful = excluded.not_helpful,
+    too_easy = excluded.too_easy,
+    too_hard = excluded.too_hard,
+    updated_at = now();
+  get diagnostics written = row_count;
+  return written;
+end;
+$$;
@@ -0,0 +1,13 @@
+-- Nightly top-k per user written by the batch precompute job
+-- (scripts/precompute_recommendations.py or the tasks.precompute_recommendations Celery task).
+create table if not exists public.precomputed_recommendations (
+  user_id uuid primary key references auth.users(id) on delete cascade,
+  recommendations jsonb not null default '[]',
+  difficulty_filter text,
+  min_sentiment numeric,
+  catalog_size integer,
+  computed_at timestamptz not null default now()
+);
+
+create index if not exists idx_precomputed_recommendations_computed_at
+  on public.precomputed_recommendations(computed_at);